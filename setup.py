@@ -1,8 +1,11 @@
 """Setup file for the Awesome Panel Extensions"""
 import pathlib
+import re
 from typing import List
 
 import setuptools
+from setuptools.command.build_py import build_py
+from setuptools.command.sdist import sdist
 
 # I only want to include a short README with a focus on the package
 with open("README.md", "r", encoding="utf-8") as fh:
@@ -10,17 +13,49 @@ with open("README.md", "r", encoding="utf-8") as fh:
 
 ROOT = pathlib.Path.cwd()
 VERSION = (ROOT / "VERSION").read_text().strip()
+ASSETS_FILE = ROOT / "src" / "paithon" / "base" / "assets.py"
+DIST_DIR = ROOT / "src" / "paithon" / "dist"
+
+
+def _check_vendored_assets():
+    # The components load the vendored JavaScript libraries by default. A package without them
+    # would depend on their CDN
+    names = re.findall(r'name="([^"]+\.js)"', ASSETS_FILE.read_text(encoding="utf8"))
+    missing = [name for name in names if not (DIST_DIR / name).is_file()]
+    if missing:
+        raise SystemExit(
+            f"The JavaScript libraries {missing} are not vendored into {DIST_DIR}. "
+            "Run 'invoke assets.download' before building the package."
+        )
+
+
+class BuildPy(build_py):
+    """Fails the build of a package without the vendored JavaScript libraries"""
+
+    def run(self):
+        if not getattr(self, "editable_mode", False):
+            _check_vendored_assets()
+        super().run()
+
+
+class SDist(sdist):
+    """Fails the build of a source distribution without the vendored JavaScript libraries"""
+
+    def run(self):
+        _check_vendored_assets()
+        super().run()
+
 
 install_requires = [
     "panel==0.12.4",
     "bokeh==2.4.1",
     "holoviews==1.14.6",
-    "ansiconv",
 ]
 
 _recommended: List[str] = []
 
 _tests = [
+    "ansiconv",
     "autoflake",
     "invoke",
     "isort",
@@ -103,4 +138,9 @@ setuptools.setup(
     install_requires=install_requires,
     extras_require=extras_require,
     tests_require=extras_require["tests"],
+    cmdclass={"build_py": BuildPy, "sdist": SDist},
+    entry_points={
+        # Registers the content endpoint with `panel serve --rest-provider paithon`
+        "panel.io.rest": ["paithon = paithon.base.content:rest_provider"],
+    },
 )
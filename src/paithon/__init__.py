@@ -0,0 +1,13 @@
+"""Paithon provides widgets, panes and tools for building AI apps with Panel.
+
+The subpackages are imported lazily the first time they are accessed."""
+import importlib
+from typing import Any
+
+__all__ = ["base", "image", "shared"]
+
+
+def __getattr__(name: str) -> Any:
+    if name not in __all__:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return importlib.import_module(f".{name}", __name__)
@@ -0,0 +1,143 @@
+"""Functionality for loading the JavaScript libraries used by the components.
+
+The libraries can be vendored into the `paithon/dist` folder of the package with
+`download_assets`. By default vendored libraries are served by the Panel server from
+`static/extensions/paithon` with a version hash in the url, such that browsers cache them
+for a long time. Building the package fails if they are not vendored. In a source checkout
+without them they are loaded from their CDN.
+"""
+import base64
+import hashlib
+import pathlib
+from typing import List, NamedTuple, Optional, Tuple
+
+import param
+from bokeh.embed.bundle import extension_dirs
+
+from .http import HTTP_CLIENT
+
+DIST_DIR = pathlib.Path(__file__).parent.parent / "dist"
+STATIC_URL = "static/extensions/paithon/"
+
+
+class Asset(NamedTuple):
+    """A JavaScript library"""
+
+    name: str
+    cdn_url: str
+
+
+APEXCHARTS = Asset(
+    name="apexcharts.min.js",
+    cdn_url="https://cdn.jsdelivr.net/npm/apexcharts@3.33.0/dist/apexcharts.min.js",
+)
+DOM_TO_IMAGE = Asset(
+    name="dom-to-image-improved.min.js",
+    cdn_url=(
+        "https://cdn.jsdelivr.net/npm/dom-to-image-improved@2.8.0/src/dom-to-image-improved.min.js"
+    ),
+)
+ASSETS = [APEXCHARTS, DOM_TO_IMAGE]
+
+
+class AssetLoader(param.Parameterized):
+    """Determines the urls the JavaScript libraries of the components are loaded from.
+
+    Use the shared `ASSET_LOADER` instance. Changing the `mode` updates the `__javascript__`
+    of all components. Set it before the first session is served."""
+
+    mode = param.Selector(
+        default="server",
+        objects=["server", "cdn", "inline"],
+        doc="""
+    'server' serves the vendored libraries from the Panel server with long lived cache headers.
+    It requires a Panel server, i.e. use 'cdn' or 'inline' in notebooks. 'cdn' loads them from
+    their CDN. 'inline' embeds them in the page as data uris, which also works for saved html
+    files. Libraries not vendored, i.e. only in a source checkout, are loaded from their CDN.""",
+    )
+    directory = param.String(
+        default=str(DIST_DIR),
+        doc="""
+    The directory of the vendored libraries.""",
+    )
+
+    def __init__(self, **params):
+        super().__init__(**params)
+        self._javascript: List[Tuple[List[str], Tuple[Asset, ...]]] = []
+
+    def javascript(self, *assets: Asset) -> List[str]:
+        """Returns a list of the urls of the assets for use as the `__javascript__` of a
+        component. The list is updated in place when the `mode` changes.
+
+        Returns:
+            List[str]: The urls
+        """
+        urls = [self.url(asset) for asset in assets]
+        self._javascript.append((urls, assets))
+        return urls
+
+    def url(self, asset: Asset) -> str:
+        """Returns the url to load the asset from
+
+        Args:
+            asset (Asset): The asset
+
+        Returns:
+            str: The url
+        """
+        if self.mode == "cdn":
+            return asset.cdn_url
+        content = self.read(asset)
+        if content is None:
+            return asset.cdn_url
+        if self.mode == "inline":
+            return "data:text/javascript;base64," + base64.b64encode(content).decode("utf8")
+        version = hashlib.sha256(content).hexdigest()[:12]
+        return f"{STATIC_URL}{asset.name}?v={version}"
+
+    def read(self, asset: Asset) -> Optional[bytes]:
+        """Returns the content of the vendored asset or None if it is not vendored
+
+        Args:
+            asset (Asset): The asset
+
+        Returns:
+            Optional[bytes]: The content
+        """
+        try:
+            return (pathlib.Path(self.directory) / asset.name).read_bytes()
+        except OSError:
+            return None
+
+    @param.depends("directory", watch=True, on_init=True)
+    def _register_directory(self):
+        extension_dirs["paithon"] = self.directory
+
+    @param.depends("mode", "directory", watch=True)
+    def _update_javascript(self):
+        for urls, assets in self._javascript:
+            urls[:] = [self.url(asset) for asset in assets]
+
+
+ASSET_LOADER = AssetLoader()
+
+
+def download_assets(directory: Optional[str] = None) -> List[pathlib.Path]:
+    """Downloads the assets from their CDN into the directory of vendored libraries
+
+    Args:
+        directory (Optional[str], optional): The directory. Defaults to None, i.e. the
+            directory of the ASSET_LOADER.
+
+    Returns:
+        List[pathlib.Path]: The paths of the downloaded files
+    """
+    path = pathlib.Path(directory or ASSET_LOADER.directory)
+    path.mkdir(parents=True, exist_ok=True)
+    files = []
+    for asset in ASSETS:
+        file = path / asset.name
+        file.write_bytes(HTTP_CLIENT.get(asset.cdn_url).content)
+        files.append(file)
+    ASSET_LOADER.param.trigger("directory")
+    return files
@@ -0,0 +1,122 @@
+"""Functionality for running a model on batches of inputs collected across sessions.
+
+Many models run much faster on one batch of inputs than on the same inputs one at a time. The
+`BatchScheduler` collects the inputs submitted by all sessions of a Panel server process within
+a small time window and calls the batched model once per batch.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, List, Tuple
+
+import param
+
+
+class BatchScheduler(param.Parameterized):
+    """Collects the inputs submitted within `max_wait_ms` into batches of up to `max_batch_size`
+    inputs and calls the batched `model` once per batch. Each result is routed back to the
+    future of its input.
+
+    A BatchScheduler can be used as the `model` of an `ImageClassifier`. Create it once at module
+    level to share it across all sessions.
+
+    Example:
+
+    >>> scheduler = BatchScheduler(model=lambda inputs: [x * 2 for x in inputs])
+    >>> scheduler(21)
+    42
+    """
+
+    model = param.Callable(
+        doc="""
+    A function taking a list of inputs and returning a list with one result per input.""",
+    )
+    max_batch_size = param.Integer(
+        32,
+        bounds=(1, None),
+        doc="""
+    The maximum number of inputs in a batch.""",
+    )
+    max_wait_ms = param.Number(
+        10.0,
+        bounds=(0, None),
+        doc="""
+    The maximum number of milliseconds to wait for more inputs after the first input of a batch
+    has been submitted.""",
+    )
+    batches = param.Integer(
+        constant=True,
+        doc="""
+    The number of batches run so far.""",
+    )
+
+    def __init__(self, **params):
+        super().__init__(**params)
+        self._queue: "queue.Queue[Tuple[Any, Future]]" = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+
+    def submit(self, item: Any) -> Future:
+        """Submits an input to be run in the next batch
+
+        Args:
+            item (Any): The input. For example a PIL Image
+
+        Returns:
+            Future: A future of the result
+        """
+        future: Future = Future()
+        self._queue.put((item, future))
+        self._ensure_worker()
+        return future
+
+    def __call__(self, item: Any) -> Any:
+        """Returns the result of the input. Blocks until its batch has run
+
+        Args:
+            item (Any): The input. For example a PIL Image
+
+        Returns:
+            Any: The result
+        """
+        return self.submit(item).result()
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name="paithon-batch-scheduler", daemon=True
+                )
+                self._worker.start()
+
+    def _next_batch(self) -> List[Tuple[Any, Future]]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait_ms / 1000
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=max(timeout, 0)))
+            except queue.Empty:
+                break
+        return [(item, future) for item, future in batch if future.set_running_or_notify_cancel()]
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                continue
+            try:
+                results = self.model([item for item, _ in batch])
+                if len(results) != len(batch):
+                    raise ValueError(
+                        f"The model returned {len(results)} results for {len(batch)} inputs"
+                    )
+            except Exception as ex:  # pylint: disable=broad-except
+                for _, future in batch:
+                    future.set_exception(ex)
+            else:
+                for (_, future), result in zip(batch, results):
+                    future.set_result(result)
+            with param.edit_constant(self):
+                self.batches += 1
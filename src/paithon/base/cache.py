@@ -0,0 +1,320 @@
+"""Caches shared by all sessions of a Panel server process"""
+import hashlib
+import json
+import os
+import pathlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, NamedTuple, Optional
+
+import param
+
+from .http import HTTP_CLIENT
+
+
+def _count(_: Any) -> int:
+    return 1
+
+
+class LRUCache:
+    """A thread safe mapping bounded by `max_size`. When full the least recently used entries
+    are evicted.
+
+    By default the size of the cache is the number of entries. Provide a `sizeof` function to
+    bound the cache by for example the number of bytes instead.
+
+    Example:
+
+    >>> cache = LRUCache(max_size=2)
+    >>> cache["a"] = 1
+    >>> cache["b"] = 2
+    >>> cache.get("a")
+    1
+    >>> cache["c"] = 3
+    >>> list(cache.keys())
+    ['a', 'c']
+    """
+
+    def __init__(self, max_size: int = 128, sizeof: Callable[[Any], int] = _count):
+        self.max_size = max_size
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._sizeof = sizeof
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Returns the value of the key and marks it as the most recently used
+
+        Args:
+            key (Hashable): The key
+            default (Any, optional): The value to return if the key is not cached.
+                Defaults to None.
+
+        Returns:
+            Any: The value
+        """
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key][0]
+            self.misses += 1
+            return default
+
+    def __setitem__(self, key: Hashable, value: Any):
+        size = self._sizeof(value)
+        with self._lock:
+            self.pop(key)
+            if size > self.max_size:
+                return
+            self._data[key] = (value, size)
+            self.size += size
+            self._evict()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def keys(self):
+        """Returns the keys from the least to the most recently used"""
+        with self._lock:
+            return list(self._data.keys())
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Removes the key and returns its value
+
+        Args:
+            key (Hashable): The key
+            default (Any, optional): The value to return if the key is not cached.
+                Defaults to None.
+
+        Returns:
+            Any: The value
+        """
+        with self._lock:
+            if key not in self._data:
+                return default
+            value, size = self._data.pop(key)
+            self.size -= size
+            return value
+
+    def clear(self):
+        """Removes all entries and resets the hits and misses"""
+        with self._lock:
+            self._data.clear()
+            self.size = self.hits = self.misses = 0
+
+    def resize(self, max_size: int):
+        """Changes the max_size and evicts entries if needed
+
+        Args:
+            max_size (int): The new max_size
+        """
+        with self._lock:
+            self.max_size = max_size
+            self._evict()
+
+    def _evict(self):
+        while self.size > self.max_size:
+            _, (_, size) = self._data.popitem(last=False)
+            self.size -= size
+
+
+class _URLCacheEntry(NamedTuple):
+    data: bytes
+    etag: str
+    last_modified: str
+    fetched: float
+
+
+class URLCache(param.Parameterized):
+    """Caches the contents of urls in memory and optionally on disk.
+
+    An entry older than `max_age` seconds is revalidated with the server using its ETag or
+    Last-Modified header before it is used again.
+
+    Use the shared `URL_CACHE` instance to share the cache across all sessions of a Panel server
+    process."""
+
+    max_size = param.Integer(
+        100 * 1024 * 1024,
+        bounds=(0, None),
+        doc="""
+    The maximum number of bytes kept in memory. Least recently used urls are evicted first.""",
+    )
+    directory = param.String(
+        default=None,
+        doc="""
+    An optional directory to persist the cached contents in. Contents evicted from memory are
+    then read from disk instead of downloaded again. Defaults to None, i.e. no persistence.""",
+    )
+    max_age = param.Number(
+        300.0,
+        bounds=(0, None),
+        doc="""
+    The number of seconds an entry is used without revalidating it with the server.""",
+    )
+
+    def __init__(self, **params):
+        super().__init__(**params)
+        self._memory = LRUCache(self.max_size, sizeof=lambda entry: len(entry.data))
+
+    @param.depends("max_size", watch=True)
+    def _resize_memory(self):
+        self._memory.resize(self.max_size)
+
+    @property
+    def hits(self) -> int:
+        """The number of urls found in memory"""
+        return self._memory.hits
+
+    @property
+    def misses(self) -> int:
+        """The number of urls not found in memory"""
+        return self._memory.misses
+
+    def get(self, url: str, verify: bool = True) -> bytes:
+        """Returns the contents of the url from the cache or downloads them
+
+        Args:
+            url (str): A url
+            verify (bool, optional): Whether or not to verify ssl certificate. Defaults to True.
+
+        Returns:
+            bytes: The contents
+        """
+        entry = self._memory.get(url) or self._read(url)
+        if entry and time.time() - entry.fetched < self.max_age:
+            self._memory[url] = entry
+            return entry.data
+
+        headers = {}
+        if entry and entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry and entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        response = HTTP_CLIENT.get(url, headers=headers, verify=verify)
+        if entry and response.status_code == 304:
+            entry = entry._replace(fetched=time.time())
+        else:
+            entry = _URLCacheEntry(
+                data=response.content,
+                etag=response.headers.get("ETag", ""),
+                last_modified=response.headers.get("Last-Modified", ""),
+                fetched=time.time(),
+            )
+        self._memory[url] = entry
+        self._write(url, entry)
+        return entry.data
+
+    def clear(self):
+        """Removes all entries from memory and disk"""
+        self._memory.clear()
+        if self.directory and os.path.isdir(self.directory):
+            for path in pathlib.Path(self.directory).glob("*.urlcache*"):
+                path.unlink()
+
+    def _path(self, url: str) -> pathlib.Path:
+        key = hashlib.sha256(url.encode("utf8")).hexdigest()
+        return pathlib.Path(self.directory) / f"{key}.urlcache"
+
+    def _read(self, url: str) -> Optional[_URLCacheEntry]:
+        if not self.directory:
+            return None
+        path = self._path(url)
+        try:
+            meta = json.loads(path.with_suffix(".urlcache-meta").read_text(encoding="utf8"))
+            data = path.read_bytes()
+        except (OSError, ValueError):
+            return None
+        if meta.pop("url") != url:
+            return None
+        return _URLCacheEntry(data=data, **meta)
+
+    def _write(self, url: str, entry: _URLCacheEntry):
+        if not self.directory:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(url)
+        meta = {
+            "url": url,
+            "etag": entry.etag,
+            "last_modified": entry.last_modified,
+            "fetched": entry.fetched,
+        }
+        for target, content in [
+            (path, entry.data),
+            (path.with_suffix(".urlcache-meta"), json.dumps(meta).encode("utf8")),
+        ]:
+            tmp = target.with_name(target.name + f".{threading.get_ident()}.tmp")
+            tmp.write_bytes(content)
+            os.replace(tmp, target)
+
+
+URL_CACHE = URLCache()
+
+
+class PredictionCache(param.Parameterized):
+    """Caches the results of models keyed by the model and the content of their input.
+
+    Use the shared `PREDICTION_CACHE` instance to share the results across all sessions of a
+    Panel server process."""
+
+    max_entries = param.Integer(
+        1000,
+        bounds=(0, None),
+        doc="""
+    The maximum number of results kept. Least recently used results are evicted first.""",
+    )
+
+    def __init__(self, **params):
+        super().__init__(**params)
+        self._results = LRUCache(self.max_entries)
+
+    @param.depends("max_entries", watch=True)
+    def _resize_results(self):
+        self._results.resize(self.max_entries)
+
+    @property
+    def hits(self) -> int:
+        """The number of results found in the cache"""
+        return self._results.hits
+
+    @property
+    def misses(self) -> int:
+        """The number of results not found in the cache"""
+        return self._results.misses
+
+    def get(self, model: Hashable, key: Hashable) -> Any:
+        """Returns the cached result of the model for the input identified by the key
+
+        Args:
+            model (Hashable): The model. For example a function
+            key (Hashable): Identifies the content of the input. For example a hash
+
+        Returns:
+            Any: The result or None if not cached
+        """
+        return self._results.get((model, key))
+
+    def set(self, model: Hashable, key: Hashable, result: Any):
+        """Caches the result of the model for the input identified by the key
+
+        Args:
+            model (Hashable): The model. For example a function
+            key (Hashable): Identifies the content of the input. For example a hash
+            result (Any): The result
+        """
+        self._results[(model, key)] = result
+
+    def clear(self):
+        """Removes all results and resets the hits and misses"""
+        self._results.clear()
+
+
+PREDICTION_CACHE = PredictionCache()
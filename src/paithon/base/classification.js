@@ -1,12 +1,26 @@
 render=()=>{
   state.oMap = function(x){return {"x": x["label"], "y": Math.round(x["score"]*100)}}
   state.theme = function(){return {default: "light", dark: "dark"}[data.theme]}
-  state.options=()=>{return {...data._base_options, series: [{name: "Score", "data": Array.from(data.output_json, state.oMap)}], colors: [data.color], theme: {mode: state.theme()}}};
-  state.chart = new ApexCharts(plot, state.options());
+  state.seriesData = function(){return Array.from(data.output_json, state.oMap)}
+  state.options=()=>{return {...data._base_options, series: [{name: "Score", "data": state.seriesData()}], colors: [data.color], theme: {mode: state.theme()}}};
+  // Only the series is updated when the output_json changes. Bursts of changes are coalesced
+  // into one update per animation frame and unchanged values are skipped.
+  state.frame = null
+  state.updateSeries = function(){
+    state.frame = null
+    const seriesData = state.seriesData()
+    const key = JSON.stringify(seriesData)
+    if (key === state.key){return}
+    state.key = key
+    state.chart.updateSeries([{name: "Score", data: seriesData}])
+  }
+  const options = state.options()
+  state.key = JSON.stringify(options.series[0].data)
+  state.chart = new ApexCharts(plot, options);
   state.chart.render();
 }
 output_json=()=>{
-  state.chart.updateOptions(state.options())
+  if (state.frame === null){state.frame = window.requestAnimationFrame(state.updateSeries)}
 }
 color=()=>{
   state.chart.updateOptions({colors: [data.color]})
@@ -16,4 +30,4 @@ theme=()=>{
 }
 after_layout=()=>{
   // window.dispatchEvent(new Event('resize'))
-}
\ No newline at end of file
+}
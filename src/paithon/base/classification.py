@@ -1,9 +1,12 @@
 """Module of classification tools"""
+from typing import Dict, List, Optional, Sequence, Tuple, Union, cast
 
+import numpy as np
 import panel as pn
 import param
 
 from ..base.reactive import read_scripts
+from .assets import APEXCHARTS, ASSET_LOADER
 from .component import get_theme
 
 ACCENT_COLOR = "#A01346"
@@ -41,6 +44,46 @@ CONFIG = {
 }
 
 
+def top_k_output_json(
+    classification: Union[List[Dict], Tuple[Sequence, Sequence]], top_k: Optional[int] = None
+) -> List[Dict]:
+    """Returns the top_k labels and scores of a classification sorted by descending score.
+
+    Only the top_k scores are sorted and formatted. This keeps large classifications, like the
+    1000 ImageNet classes, cheap.
+
+    Example:
+
+    >>> top_k_output_json((["cat", "dog", "car"], [0.2, 0.7, 0.1]), top_k=2)
+    [{'label': 'dog', 'score': 0.7}, {'label': 'cat', 'score': 0.2}]
+
+    Args:
+        classification (Union[List[Dict], Tuple[Sequence, Sequence]]): A list of dicts with a
+            'label' and a 'score' or a (labels, scores) pair of sequences or NumPy arrays. The
+            pair can also be a list
+        top_k (Optional[int], optional): The number of labels to return. Defaults to None, i.e.
+            all.
+
+    Returns:
+        List[Dict]: A list of dicts with a 'label' and a 'score'
+    """
+    label_array: Optional[np.ndarray] = None
+    if len(classification) == 2 and not isinstance(classification[0], dict):
+        label_array = np.asarray(classification[0]).ravel()
+        score_array = np.asarray(classification[1], dtype=float).ravel()
+    else:
+        items = cast(List[Dict], classification)
+        score_array = np.fromiter((item["score"] for item in items), dtype=float, count=len(items))
+    if top_k is None or top_k >= len(score_array):
+        index = np.argsort(-score_array, kind="stable")
+    else:
+        index = np.argpartition(-score_array, top_k - 1)[:top_k]
+        index = index[np.argsort(-score_array[index], kind="stable")]
+    if label_array is None:
+        return [items[i] for i in index]
+    return [{"label": str(label_array[i]), "score": float(score_array[i])} for i in index]
+
+
 class ClassificationPlot(pn.reactive.ReactiveHTML):
     """The ClassificationPlot provides plots of the output of a classification, i.e. the *labels*
     and their *score*."""
@@ -68,7 +111,7 @@ class ClassificationPlot(pn.reactive.ReactiveHTML):
 
     _scripts = read_scripts("classification.js", __file__)
 
-    __javascript__ = ["https://cdn.jsdelivr.net/npm/apexcharts"]
+    __javascript__ = ASSET_LOADER.javascript(APEXCHARTS)
 
     def __init__(self, **params):
         params["theme"] = params.get("theme", get_theme())
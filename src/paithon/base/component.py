@@ -1,8 +1,13 @@
 """Helper functionality for creating components"""
-from typing import Dict, Tuple
+import asyncio
+import inspect
+from typing import Callable, Dict, Set, Tuple
 
 import panel as pn
 
+# The tasks scheduled by call_soon that have not finished yet
+_TASKS: Set[asyncio.Future] = set()
+
 LAYOUT_PARAMETERS = {
     "background",
     "height",
@@ -47,3 +52,31 @@ def extract_layout_parameters(params: Dict) -> Tuple[Dict, Dict]:
     if "name" in params:
         non_layout_params["name"] = layout_params["name"] = params["name"]
     return non_layout_params, layout_params
+
+
+def call_soon(callback: Callable, doc=None):
+    """Calls the callback on the event loop of the session of the document.
+
+    Use it to apply results computed in another thread or in a coroutine to the session. Without
+    a session, for example in a notebook or a test, the callback is called right away.
+
+    Args:
+        callback (Callable): A function or coroutine function without arguments
+        doc (Document, optional): The document of the session. Defaults to pn.state.curdoc.
+            Provide it when calling from another thread.
+    """
+    doc = doc or pn.state.curdoc
+    if doc is not None and doc.session_context is not None:
+        doc.add_next_tick_callback(callback)
+        return
+    result = callback()
+    if inspect.iscoroutine(result):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            asyncio.run(result)
+        else:
+            # The loop only keeps a weak reference to the task
+            task = asyncio.ensure_future(result, loop=loop)
+            _TASKS.add(task)
+            task.add_done_callback(_TASKS.discard)
@@ -0,0 +1,180 @@
+"""Functionality for serving binary contents like images from a content addressed endpoint.
+
+Instead of embedding for example an image as a base64 encoded data uri in the Bokeh document,
+the image is added to the `CONTENT_STORE` and referenced by its url. The url contains the sha256
+hex digest of the contents, i.e. it never changes meaning. Browsers cache it forever and the
+same contents are only stored once per process no matter how many sessions show them.
+
+The endpoint must be registered with the Panel server. Either use
+
+    pn.serve(app, extra_patterns=CONTENT_STORE.patterns())
+
+or
+
+    panel serve app.py --rest-provider paithon
+
+Until the endpoint is registered the components fall back to data uris.
+"""
+import hashlib
+from typing import List, NamedTuple, Optional
+
+import param
+from tornado import web
+
+from .cache import LRUCache
+
+CONTENT_URL = "paithon/content/"
+CONTENT_ID_PATTERN = "[0-9a-f]{64}"
+
+
+class Content(NamedTuple):
+    """The bytes and mime type of some content"""
+
+    data: bytes
+    mime_type: str
+
+
+class ContentStore(param.Parameterized):
+    """Keeps binary contents in memory by their sha256 hex digest such that they can be served
+    from a content addressed url.
+
+    Use the shared `CONTENT_STORE` instance to store the contents only once per Panel server
+    process.
+
+    Example:
+
+    >>> store = ContentStore()
+    >>> content_id = store.add(b"hello", "text/plain")
+    >>> store.get(content_id)
+    Content(data=b'hello', mime_type='text/plain')
+    >>> store.url(content_id) == "paithon/content/" + content_id
+    True
+    """
+
+    max_size = param.Integer(
+        200 * 1024 * 1024,
+        bounds=(0, None),
+        doc="""
+    The maximum number of bytes kept in memory. Least recently used contents are evicted first.
+    An evicted url responds with 404 Not Found, but browsers that have already loaded it keep
+    using their cached copy.""",
+    )
+    serving = param.Boolean(
+        False,
+        doc="""
+    Whether or not the endpoint is registered with the Panel server. It is set to True by
+    `patterns`. While it is False the components use data uris instead of urls.""",
+    )
+
+    def __init__(self, **params):
+        super().__init__(**params)
+        self._contents = LRUCache(self.max_size, sizeof=lambda content: len(content.data))
+
+    @param.depends("max_size", watch=True)
+    def _resize_contents(self):
+        self._contents.resize(self.max_size)
+
+    def add(self, data: bytes, mime_type: str, content_id: str = "") -> str:
+        """Adds the contents to the store
+
+        Args:
+            data (bytes): The contents. For example the encoded bytes of a .png file
+            mime_type (str): The mime type. For example 'image/png'
+            content_id (str, optional): The sha256 hex digest of the data if already known.
+                Defaults to "", i.e. it is computed.
+
+        Returns:
+            str: The content id, i.e. the sha256 hex digest of the data
+        """
+        content_id = content_id or hashlib.sha256(data).hexdigest()
+        if content_id not in self._contents:
+            self._contents[content_id] = Content(data, mime_type)
+        return content_id
+
+    def get(self, content_id: str) -> Optional[Content]:
+        """Returns the contents with the id
+
+        Args:
+            content_id (str): The content id
+
+        Returns:
+            Optional[Content]: The contents or None if not in the store
+        """
+        return self._contents.get(content_id)
+
+    def __contains__(self, content_id: str) -> bool:
+        return content_id in self._contents
+
+    def url(self, content_id: str) -> str:
+        """Returns the url of the contents relative to the page of the Panel application
+
+        Args:
+            content_id (str): The content id
+
+        Returns:
+            str: The url
+        """
+        # pylint: disable=import-outside-toplevel
+        from panel.io.state import state
+
+        if state.rel_path:
+            return f"{state.rel_path}/{CONTENT_URL}{content_id}"
+        return CONTENT_URL + content_id
+
+    def clear(self):
+        """Removes all contents"""
+        self._contents.clear()
+
+    def patterns(self) -> List[tuple]:
+        """Returns the url patterns of the endpoint for use as the `extra_patterns` of `pn.serve`.
+
+        The endpoint is then considered registered, i.e. `serving` is set to True.
+
+        Returns:
+            List[tuple]: The url patterns
+        """
+        self.serving = True
+        return [(rf"/{CONTENT_URL}({CONTENT_ID_PATTERN})", ContentHandler, {"store": self})]
+
+
+class ContentHandler(web.RequestHandler):  # pylint: disable=abstract-method
+    """Serves the contents of a ContentStore by their id with immutable cache headers"""
+
+    def initialize(self, store: ContentStore):  # pylint: disable=arguments-differ
+        """Sets the store to serve the contents of"""
+        self.store = store  # pylint: disable=attribute-defined-outside-init
+
+    def compute_etag(self) -> Optional[str]:
+        # The url identifies the contents. No need to hash the response again
+        return None
+
+    def get(self, content_id: str):  # pylint: disable=arguments-differ
+        """Responds with the contents of the id"""
+        content = self.store.get(content_id)
+        if content is None:
+            raise web.HTTPError(404)
+        self.set_header("Etag", f'"{content_id}"')
+        self.set_header("Cache-Control", "public, max-age=31536000, immutable")
+        if self.check_etag_header():
+            self.set_status(304)
+            return
+        self.set_header("Content-Type", content.mime_type)
+        self.write(content.data)
+
+
+CONTENT_STORE = ContentStore()
+
+
+def rest_provider(
+    files: List[str], endpoint: str  # pylint: disable=unused-argument
+) -> List[tuple]:
+    """Registers the endpoint of the `CONTENT_STORE` with `panel serve --rest-provider paithon`
+
+    Args:
+        files (List[str]): The files served. Not used
+        endpoint (str): The rest endpoint. Not used. The contents are served from CONTENT_URL
+
+    Returns:
+        List[tuple]: The url patterns
+    """
+    return CONTENT_STORE.patterns()
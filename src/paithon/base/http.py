@@ -0,0 +1,138 @@
+"""Functionality for downloading the contents of urls.
+
+All downloads go through one pooled `requests.Session` per process. Connections are kept alive
+and reused, and every request has a timeout and a maximum response size.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Mapping, NamedTuple, Optional, Sequence, TypeVar
+
+import param
+import requests
+from requests.adapters import HTTPAdapter
+
+T = TypeVar("T")
+
+_CHUNK_SIZE = 64 * 1024
+
+
+class HTTPResponse(NamedTuple):
+    """The status, headers and contents of a response"""
+
+    status_code: int
+    headers: Mapping[str, str]
+    content: bytes
+
+
+class HTTPClient(param.Parameterized):
+    """Downloads the contents of urls through a pooled session with keep-alive connections.
+
+    Use the shared `HTTP_CLIENT` instance to share the connections across all sessions of a Panel
+    server process."""
+
+    connect_timeout = param.Number(
+        3.05,
+        bounds=(0, None),
+        doc="""
+    The number of seconds to wait for a connection to the server.""",
+    )
+    read_timeout = param.Number(
+        30.0,
+        bounds=(0, None),
+        doc="""
+    The number of seconds to wait for the server to send data.""",
+    )
+    max_size = param.Integer(
+        50 * 1024 * 1024,
+        bounds=(0, None),
+        doc="""
+    The maximum number of bytes of a response. Larger responses raise a ValueError.""",
+    )
+    max_workers = param.Integer(
+        8,
+        bounds=(1, None),
+        doc="""
+    The number of urls downloaded concurrently by `map`. Also the number of connections kept
+    alive per host.""",
+    )
+
+    def __init__(self, **params):
+        super().__init__(**params)
+        self._session = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        """Returns the pooled session"""
+        with self._lock:
+            if self._session is None:
+                adapter = HTTPAdapter(
+                    pool_connections=self.max_workers, pool_maxsize=self.max_workers
+                )
+                self._session = requests.Session()
+                self._session.mount("http://", adapter)
+                self._session.mount("https://", adapter)
+            return self._session
+
+    @param.depends("max_workers", watch=True)
+    def _reset_session(self):
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    def get(
+        self, url: str, headers: Optional[Dict[str, str]] = None, verify: bool = True
+    ) -> HTTPResponse:
+        """Returns the response of a GET request to the url
+
+        Args:
+            url (str): A url
+            headers (Optional[Dict[str, str]], optional): Additional request headers.
+                Defaults to None.
+            verify (bool, optional): Whether or not to verify ssl certificate. Defaults to True.
+
+        Raises:
+            requests.HTTPError: If the response has an error status code
+            ValueError: If the response is larger than `max_size`
+
+        Returns:
+            HTTPResponse: The response
+        """
+        with self.session.get(
+            url,
+            headers=headers,
+            verify=verify,
+            stream=True,
+            timeout=(self.connect_timeout, self.read_timeout),
+        ) as response:
+            response.raise_for_status()
+            if int(response.headers.get("Content-Length", 0)) > self.max_size:
+                raise ValueError(f"The response from {url} is larger than {self.max_size} bytes")
+            content = bytearray()
+            for chunk in response.iter_content(_CHUNK_SIZE):
+                content += chunk
+                if len(content) > self.max_size:
+                    raise ValueError(
+                        f"The response from {url} is larger than {self.max_size} bytes"
+                    )
+            return HTTPResponse(response.status_code, response.headers, bytes(content))
+
+    def map(self, func: Callable[[str], T], urls: Sequence[str]) -> List[T]:
+        """Returns the results of applying the function to the urls concurrently
+
+        Args:
+            func (Callable[[str], T]): A function downloading a url. For example
+                `load_image_from_url`
+            urls (Sequence[str]): The urls
+
+        Returns:
+            List[T]: The results in the order of the urls
+        """
+        if len(urls) <= 1:
+            return [func(url) for url in urls]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(urls))) as executor:
+            return list(executor.map(func, urls))
+
+
+HTTP_CLIENT = HTTPClient()
@@ -0,0 +1,34 @@
+"""Functionality for importing the attributes of a package lazily.
+
+Importing a package should be fast. The attributes exported by a package are therefore only
+imported from their modules the first time they are accessed.
+"""
+import importlib
+import sys
+from typing import Any, Callable, Dict
+
+
+def lazy_getattr(package: str, attributes: Dict[str, str]) -> Callable[[str], Any]:
+    """Returns a module level `__getattr__` function importing the attributes lazily
+
+    Example:
+
+    >>> __getattr__ = lazy_getattr(__name__, {"ImageInput": ".image_input"}) # doctest: +SKIP
+
+    Args:
+        package (str): The name of the package. I.e. `__name__`
+        attributes (Dict[str, str]): A mapping from the name of an attribute to the relative
+            name of the module defining it
+
+    Returns:
+        Callable[[str], Any]: The `__getattr__` function
+    """
+
+    def __getattr__(name: str) -> Any:
+        if name not in attributes:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(attributes[name], package), name)
+        setattr(sys.modules[package], name, value)
+        return value
+
+    return __getattr__
@@ -1,9 +1,121 @@
 """Module for making the developer experience for ReactiveHTML
 event better
 """
+import functools
+import json
+import os
 import pathlib
+import re
 import textwrap
-from typing import Dict
+from typing import Dict, Iterator, List, Optional, Tuple
+
+PACKAGE_DIR = pathlib.Path(__file__).parent.parent
+SCRIPTS_ARTIFACT = PACKAGE_DIR / "_scripts.json"
+# In a source checkout the .js files may be changed after the artifact was compiled. An
+# installed package is not changed, and installing it changes the modification times
+SOURCE_CHECKOUT = (PACKAGE_DIR.parent.parent / "setup.py").is_file()
+
+# A script starts with a line like `name=()=>{`, `name=(event)=>{` or `name=event=>{` at the
+# start of the line and ends with the `}` matching its `{`.
+_SCRIPT_START = re.compile(
+    r"(?P<name>[A-Za-z_$][\w$]*)[ \t]*=[ \t]*(?:\([^)]*\)|[A-Za-z_$][\w$]*)[ \t]*=>[ \t]*\{\s*$"
+)
+_COMMENT = re.compile(r"^\s*(//.*)?$")
+
+
+def _skip_string(line: str, index: int) -> int:
+    # Returns the index after the string literal starting at index
+    quote = line[index]
+    index += 1
+    while index < len(line) and line[index] != quote:
+        index += 2 if line[index] == "\\" else 1
+    return index + 1
+
+
+def _scan_comment(line: str, index: int, stack: List[str]) -> int:
+    if line.startswith("*/", index):
+        stack.pop()
+        return index + 2
+    return index + 1
+
+
+def _scan_template(line: str, index: int, stack: List[str]) -> int:
+    char = line[index]
+    if char == "\\":
+        return index + 2
+    if char == "`":
+        stack.pop()
+    elif line.startswith("${", index):
+        stack.append("${")
+        return index + 2
+    return index + 1
+
+
+def _scan_code(line: str, index: int, stack: List[str]) -> int:
+    char = line[index]
+    if char in "'\"":
+        return _skip_string(line, index)
+    if line.startswith("//", index):
+        return len(line)
+    if line.startswith("/*", index):
+        stack.append("/*")
+        return index + 2
+    if char == "\\":
+        return index + 2
+    if char in "`{":
+        stack.append(char)
+    elif char == "}":
+        stack.pop()
+    return index + 1
+
+
+_SCANNERS = {"/*": _scan_comment, "`": _scan_template}
+
+
+def _match_brace(line: str, stack: List[str]) -> int:
+    # Scans the line for the `}` closing the outermost `{` on the stack and returns its index or
+    # -1. The stack holds the open `{`, template literals "`", their `${` expressions and block
+    # comments "/*" across lines. Braces in strings, template literals and comments are
+    # skipped. A backslash outside strings, i.e. in a regular expression, escapes the next
+    # character
+    index = 0
+    while index < len(line):
+        index = _SCANNERS.get(stack[-1], _scan_code)(line, index, stack)
+        if not stack:
+            return index - 1
+    return -1
+
+
+def _tokenize(text: str) -> Iterator[Tuple[str, Optional[str], int]]:
+    # Yields the (name, body, line number) of each script and ("", line, line number) of each
+    # line outside the scripts in one pass over the lines. The body of a script whose braces are
+    # not matched is None
+    name = ""
+    body: List[str] = []
+    stack: List[str] = []
+    number = 0
+    for number, line in enumerate(text.splitlines(), start=1):
+        if name:
+            end = _match_brace(line, stack)
+            if end < 0:
+                body.append(line)
+                continue
+            if line[:end].strip():
+                body.append(line[:end])
+            yield name, "\n".join(body), number
+            name = ""
+            line = line[end + 1 :]
+            if not line.strip():
+                continue
+        match = _SCRIPT_START.match(line)
+        if match:
+            name = match.group("name")
+            body = []
+            stack = ["{"]
+        else:
+            yield "", line, number
+    if name:
+        yield name, None, number
 
 
 def _clean_script(value):
@@ -13,6 +125,9 @@ def _clean_script(value):
 def text_to_scripts(text: str) -> Dict:
     """Returns a `_scripts` dictionary for ReactiveHTML based on a string
 
+    A script starts with a line like `name=()=>{` and ends with its matching `}`. Braces in
+    strings, template literals and comments are ignored.
+
     Args:
         text (str): The input string
 
@@ -32,27 +147,77 @@ def text_to_scripts(text: str) -> Dict:
     >>> text_to_scripts(txt)
     {'render': 'console.log(data)', 'value': 'my_func(value)'}
     """
-    lines = text.split("\n")
-    scripts = {}
-    key = ""
-    value = ""
-    for line in lines:
-        if key:
-            if line == "}":
-                scripts[key] = _clean_script(value)
-                key = value = ""
-            else:
-                value += line + "\n"
-        else:
-            if line and not line[0] == " " and line.endswith(")=>{") and "=(" in line:
-                key = line.split("=")[0]
+    return {
+        name: _clean_script(body) for name, body, _ in _tokenize(text) if name and body is not None
+    }
+
+
+def validate_scripts(text: str) -> Dict:
+    """Returns a `_scripts` dictionary like `text_to_scripts`. But raises a ValueError if the
+    text contains no scripts or any text outside the scripts other than comments.
 
+    Args:
+        text (str): The input string
+
+    Raises:
+        ValueError: If the text is not valid
+
+    Returns:
+        Dict: The output `_scripts`
+    """
+    scripts = {}
+    for name, body, number in _tokenize(text):
+        if body is None:
+            raise ValueError(f"The script {name!r} is not ended by a matching '}}'")
+        if name:
+            scripts[name] = _clean_script(body)
+        elif not _COMMENT.match(body):
+            raise ValueError(f"Line {number} is not part of a script: {body!r}")
+    if not scripts:
+        raise ValueError("The text contains no scripts")
     return scripts
 
 
+@functools.lru_cache(maxsize=None)
+def _read_scripts(path: str, mtime_ns: int) -> Dict:  # pylint: disable=unused-argument
+    # The modification time is part of the key such that changes to the file are picked up
+    with open(path, "r", encoding="utf8") as _file:
+        return text_to_scripts(_file.read())
+
+
+@functools.lru_cache(maxsize=None)
+def _read_artifact() -> Dict[str, Dict]:
+    try:
+        return json.loads(SCRIPTS_ARTIFACT.read_text(encoding="utf8"))
+    except OSError:
+        return {}
+
+
+def _artifact_key(path: pathlib.Path) -> Optional[str]:
+    try:
+        return path.resolve().relative_to(PACKAGE_DIR.resolve()).as_posix()
+    except ValueError:
+        return None
+
+
+def _is_current(path: pathlib.Path, entry: Dict) -> bool:
+    # Only the file is stat'ed. It is not read
+    if not SOURCE_CHECKOUT:
+        return True
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return True
+    return (stat.st_size, stat.st_mtime_ns) == (entry["size"], entry["mtime_ns"])
+
+
 def read_scripts(jsfile: str = "", pyfile: str = "") -> dict:
     """Reads a `.js` file and converts it to a _scripts dictionary
 
+    The scripts are taken from the precompiled SCRIPTS_ARTIFACT if it contains the file. In a
+    source checkout only if the size and modification time of the file are unchanged. Otherwise
+    the file is read and parsed once per modification time.
+
     Args:
         jsfile (Union[str,pathlib.Path], optional): The path or name of the file.
         pyfile (str, optional): Optional __file__ of the .py file file.
@@ -66,6 +231,63 @@ def read_scripts(jsfile: str = "", pyfile: str = "") -> dict:
     else:
         full_path = pathlib.Path(jsfile)
 
-    with open(full_path, "r", encoding="utf8") as _file:
-        text = _file.read()
-    return text_to_scripts(text)
+    key = _artifact_key(full_path)
+    entry = _read_artifact().get(key) if key else None
+    if entry is not None and _is_current(full_path, entry):
+        return dict(entry["scripts"])
+    return dict(_read_scripts(str(full_path), os.stat(full_path).st_mtime_ns))
+
+
+def merge_scripts(*scripts: Dict) -> Dict:
+    """Merges `_scripts` dictionaries. Scripts with the same name are concatenated in order,
+    such that a component can combine shared scripts with its own.
+
+    Args:
+        scripts (Dict): The `_scripts` dictionaries
+
+    Returns:
+        Dict: The merged `_scripts`
+
+    Example:
+
+    >>> merge_scripts({"render": "state.a = 1"}, {"render": "state.b = 2", "value": "f()"})
+    {'render': 'state.a = 1\\nstate.b = 2', 'value': 'f()'}
+    """
+    merged: Dict[str, str] = {}
+    for _scripts in scripts:
+        for name, body in _scripts.items():
+            merged[name] = f"{merged[name]}\n{body}" if name in merged else body
+    return merged
+
+
+def compile_scripts(path: Optional[str] = None) -> pathlib.Path:
+    """Validates the scripts of all `.js` files in the package and saves them to a JSON artifact.
+    Run it when building the package, such that `read_scripts` does not read and parse the
+    files at import. The size and modification time of each file are stored with its scripts.
+    In a source checkout a file changed after compiling is parsed again.
+
+    Args:
+        path (Optional[str], optional): The path of the artifact. Defaults to None, i.e. the
+            SCRIPTS_ARTIFACT.
+
+    Raises:
+        ValueError: If a `.js` file is not valid
+
+    Returns:
+        pathlib.Path: The path of the artifact
+    """
+    artifact = {}
+    for jsfile in sorted(PACKAGE_DIR.rglob("*.js")):
+        key = jsfile.relative_to(PACKAGE_DIR).as_posix()
+        if key.startswith("dist/"):
+            continue
+        stat = jsfile.stat()
+        try:
+            scripts = validate_scripts(jsfile.read_text(encoding="utf8"))
+        except ValueError as ex:
+            raise ValueError(f"{key}: {ex}") from ex
+        artifact[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "scripts": scripts}
+    target = pathlib.Path(path) if path else SCRIPTS_ARTIFACT
+    target.write_text(json.dumps(artifact, indent=2, sort_keys=True), encoding="utf8")
+    _read_artifact.cache_clear()
+    return target
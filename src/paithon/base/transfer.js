@@ -0,0 +1,49 @@
+// The client side of the chunked transfer. See ChunkReceiver in transfer.py.
+// The scripts are merged into the scripts of the component with merge_scripts.
+render=()=>{
+  // Sends the next chunk of the transfer. The following chunk is only sent when the server has
+  // acknowledged the previous one. See _chunk_ack below.
+  function sendChunk(transfer) {
+    const end = Math.min(transfer.offset + data.chunk_size, transfer.blob.size)
+    var reader = new FileReader();
+    reader.onload = function(e) {
+      if (state.transfer !== transfer){return}
+      const uri = e.target.result
+      data._chunk = Object.assign({}, transfer.fields, {
+        id: transfer.id,
+        offset: transfer.offset,
+        size: transfer.blob.size,
+        data: uri.slice(uri.indexOf(",") + 1),
+      })
+    }
+    reader.readAsDataURL(transfer.blob.slice(transfer.offset, end));
+  }
+  // Transfers the blob to the server. The fields are sent with each chunk. onDone is called with
+  // the acknowledgement of the last chunk
+  function startTransfer(blob, fields, onDone){
+    const transfer = {
+      id: Date.now().toString(36) + Math.random().toString(36).slice(2),
+      blob: blob,
+      fields: fields,
+      onDone: onDone,
+      offset: 0,
+    }
+    state.transfer = transfer
+    sendChunk(transfer)
+  }
+  state.sendChunk = sendChunk
+  state.startTransfer = startTransfer
+  state.transfer = null
+}
+_chunk_ack=()=>{
+  const transfer = state.transfer
+  const ack = data._chunk_ack
+  if (!transfer || ack.id !== transfer.id){return}
+  if (ack.offset < 0 || ack.offset >= transfer.blob.size){
+    state.transfer = null
+    if (ack.offset >= 0 && transfer.onDone){transfer.onDone(ack)}
+  } else {
+    transfer.offset = ack.offset
+    state.sendChunk(transfer)
+  }
+}
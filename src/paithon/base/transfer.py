@@ -0,0 +1,165 @@
+"""Functionality for transferring large binary values from the client in chunks.
+
+A single large message blocks the event loop of the server while it is parsed. Instead the
+client sends fixed size slices and the server reassembles them into a preallocated buffer.
+
+The client side of the handshake is in `transfer.js`. Its scripts are merged into the `_scripts`
+of a ReactiveHTML component with `merge_scripts(TRANSFER_SCRIPTS, ...)`.
+"""
+import binascii
+from typing import Callable, Dict, Optional
+
+import param
+
+from .reactive import read_scripts
+
+TRANSFER_SCRIPTS = read_scripts("transfer.js", __file__)
+
+
+class ChunkAssembler:
+    """Reassembles a binary value from base64 encoded chunks into a preallocated buffer.
+
+    Chunks must arrive in order. A chunk with an unexpected offset is ignored and `add` returns
+    the offset the client should resume from.
+
+    Example:
+
+    >>> assembler = ChunkAssembler("upload-1", size=5)
+    >>> assembler.add(0, "aGVs")
+    3
+    >>> assembler.progress
+    60
+    >>> assembler.add(3, "bG8=")
+    5
+    >>> assembler.complete, assembler.getvalue()
+    (True, b'hello')
+    """
+
+    def __init__(self, transfer_id: str, size: int):
+        if size < 0:
+            raise ValueError("The size must be a non-negative integer")
+        self.transfer_id = transfer_id
+        self.size = size
+        self.received = 0
+        self._buffer = bytearray(size)
+
+    def add(self, offset: int, data: str) -> int:
+        """Adds a base64 encoded chunk starting at the given offset
+
+        Args:
+            offset (int): The position of the chunk in the value
+            data (str): The base64 encoded chunk
+
+        Raises:
+            ValueError: If the chunk would exceed the size of the value
+
+        Returns:
+            int: The number of bytes received so far, i.e. the offset of the next chunk
+        """
+        if offset != self.received:
+            return self.received
+        chunk = binascii.a2b_base64(data)
+        end = offset + len(chunk)
+        if end > self.size:
+            raise ValueError(
+                f"The chunk ends at byte {end} which is beyond the size {self.size} of the value"
+            )
+        self._buffer[offset:end] = chunk
+        self.received = end
+        return end
+
+    @property
+    def complete(self) -> bool:
+        """Returns True if all the bytes of the value have been received"""
+        return self.received == self.size
+
+    @property
+    def progress(self) -> int:
+        """Returns the progress of the transfer in percent"""
+        if not self.size:
+            return 100
+        return int(100 * self.received / self.size)
+
+    def getvalue(self) -> bytes:
+        """Returns the reassembled value"""
+        return bytes(self._buffer)
+
+
+class ChunkReceiver:
+    """Receives the chunks a ReactiveHTML component sends via its `_chunk` parameter and
+    acknowledges each of them via its `_chunk_ack` parameter.
+
+    A chunk is a dict with the keys 'id', 'offset', 'size' and 'data' and optionally additional
+    keys of the transfer. The acknowledgement is a dict with the keys 'id' and 'offset', where
+    the offset is the offset of the next chunk. An offset of -1 means the transfer is cancelled.
+    The client only sends the next chunk when the previous one is acknowledged.
+
+    The owner must have the parameters `max_size_in_mega_bytes`, `progress` and `_chunk_ack`.
+
+    Args:
+        owner (param.Parameterized): The component receiving the chunks
+        on_complete (Callable[[bytes, Dict], Optional[Dict]]): Called with the value and the
+            last chunk when the transfer is complete. It may return additional keys for the
+            acknowledgement of the last chunk.
+    """
+
+    def __init__(
+        self,
+        owner: param.Parameterized,
+        on_complete: Callable[[bytes, Dict], Optional[Dict]],
+    ):
+        self.owner = owner
+        self.on_complete = on_complete
+        self.transfer: Optional[ChunkAssembler] = None
+
+    def receive(self, chunk: Optional[Dict], progress_start: int = 0):
+        """Adds the chunk to its transfer and acknowledges it. The first chunk of a transfer
+        starts it. A transfer larger than `max_size_in_mega_bytes` or with an invalid chunk is
+        cancelled.
+
+        Args:
+            chunk (Optional[Dict]): The chunk
+            progress_start (int, optional): The progress in percent when the transfer starts.
+                The transfer fills the rest. Defaults to 0.
+        """
+        if not chunk:
+            return
+
+        if self.transfer is None or self.transfer.transfer_id != chunk["id"]:
+            if chunk["size"] > self.owner.max_size_in_mega_bytes * 1000000:
+                self._acknowledge(chunk["id"], -1)
+                return
+            self.transfer = ChunkAssembler(chunk["id"], chunk["size"])
+
+        transfer = self.transfer
+        try:
+            offset = transfer.add(chunk["offset"], chunk["data"])
+        except ValueError:
+            # For example a chunk beyond the announced size or invalid base64
+            self.cancel()
+            return
+        self._set_progress(progress_start + transfer.progress * (100 - progress_start) // 100)
+        extra = None
+        if transfer.complete:
+            self.transfer = None
+            extra = self.on_complete(transfer.getvalue(), chunk)
+        self._acknowledge(transfer.transfer_id, offset, extra)
+
+    def cancel(self):
+        """Cancels the transfer in progress, if any, and resets the progress"""
+        if self.transfer is not None:
+            self._acknowledge(self.transfer.transfer_id, -1)
+            self.transfer = None
+        self._set_progress(0)
+
+    def _set_progress(self, progress: int):
+        with param.edit_constant(self.owner):
+            self.owner.progress = progress
+
+    def _acknowledge(self, transfer_id: str, offset: int, extra: Optional[Dict] = None):
+        with param.edit_constant(self.owner):
+            self.owner._chunk_ack = {  # pylint: disable=protected-access
+                "id": transfer_id,
+                "offset": offset,
+                **(extra or {}),
+            }
@@ -0,0 +1,201 @@
+"""Functionality for converting images to NumPy arrays for models.
+
+Most models start with `np.asarray(image)` followed by a resize, a conversion to float, a
+normalization and a stacking into a batch. Each step is a full copy of the image. `to_array`
+resizes the image with Pillow and then converts and normalizes it in one vectorized pass
+directly into an optionally preallocated buffer. `stack_batch` fills a contiguous batch array
+the same way.
+"""
+from typing import Optional, Sequence, Tuple, Union
+
+import numpy as np
+import numpy.typing as npt
+import PIL
+
+from .pillow import ImageValue, Size
+
+Image = Union[PIL.Image.Image, ImageValue]
+Normalization = Optional[Union[float, Sequence[float]]]
+
+IMAGENET_MEAN = (0.485, 0.456, 0.406)
+IMAGENET_STD = (0.229, 0.224, 0.225)
+
+
+def _hwc_view(out: np.ndarray, layout: str) -> np.ndarray:
+    # A view of the buffer with the channels last, such that the image can be written to it
+    # without transposing it first
+    if layout in ("CHW", "NCHW"):
+        return np.moveaxis(out, -3, -1)
+    return out
+
+
+def _shape(size: Size, channels: int, layout: str) -> Tuple[int, int, int]:
+    width, height = size
+    if layout == "CHW":
+        return (channels, height, width)
+    return (height, width, channels)
+
+
+def to_array(  # pylint: disable=too-many-arguments
+    image: Image,
+    size: Optional[Size] = None,
+    *,
+    dtype: npt.DTypeLike = np.float32,
+    layout: str = "HWC",
+    mean: Normalization = None,
+    std: Normalization = None,
+    mode: str = "RGB",
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Returns the image as an array for a model
+
+    The image is resized and converted to the mode by Pillow. The pixels are then converted to
+    the dtype, scaled and normalized in one pass directly into the `out` buffer. A floating
+    point dtype gives values `(pixel / 255 - mean) / std`. An integer dtype gives the pixels
+    as they are.
+
+    Example:
+
+    >>> image = PIL.Image.new("RGB", (4, 2), color=(255, 0, 51))
+    >>> array = to_array(image, size=(2, 2), layout="CHW")
+    >>> array.shape, array.dtype, array[:, 0, 0].tolist()
+    ((3, 2, 2), dtype('float32'), [1.0, 0.0, 0.20000000298023224])
+
+    Args:
+        image (Image): A PIL Image or an ImageValue
+        size (Optional[Size], optional): The (width, height) to resize to. Defaults to None,
+            i.e. the size of the image.
+        dtype (npt.DTypeLike, optional): The dtype of the array. Defaults to np.float32.
+        layout (str, optional): 'HWC' for channels last or 'CHW' for channels first.
+            Defaults to 'HWC'.
+        mean (Normalization, optional): The mean subtracted from the scaled values. One value
+            or one per channel. For example IMAGENET_MEAN. Defaults to None, i.e. 0.
+        std (Normalization, optional): The standard deviation the values are divided by. One
+            value or one per channel. For example IMAGENET_STD. Defaults to None, i.e. 1.
+        mode (str, optional): The PIL mode to convert the image to. Defaults to 'RGB'.
+        out (Optional[np.ndarray], optional): A preallocated array to write to. It must have the
+            shape and dtype of the result. Defaults to None, i.e. a new array is allocated.
+
+    Raises:
+        ValueError: If the layout is not supported or the out array does not fit
+
+    Returns:
+        np.ndarray: The array. It is the `out` array if provided
+    """
+    if layout not in ("HWC", "CHW"):
+        raise ValueError(f"The layout {layout!r} is not supported. Use 'HWC' or 'CHW'")
+    if isinstance(image, ImageValue):
+        image = image.image
+    size = tuple(size or image.size)
+    shape = _shape(size, PIL.Image.getmodebands(mode), layout)
+    if out is None:
+        out = np.empty(shape, dtype=dtype)
+    elif out.shape != shape or out.dtype != np.dtype(dtype):
+        raise ValueError(
+            f"The out array has shape {out.shape} and dtype {out.dtype}. Expected shape {shape} "
+            f"and dtype {np.dtype(dtype)}"
+        )
+    _write(image, size, mean=mean, std=std, mode=mode, target=_hwc_view(out, layout))
+    return out
+
+
+def _write(  # pylint: disable=too-many-arguments
+    image: PIL.Image.Image,
+    size: Size,
+    *,
+    mean: Normalization,
+    std: Normalization,
+    mode: str,
+    target: np.ndarray,
+):
+    if image.mode != mode:
+        image = image.convert(mode)
+    if image.size != size:
+        image = image.resize(size, PIL.Image.BICUBIC)
+    # The only intermediate copy. Pillow exposes the pixels via the array interface
+    pixels = np.asarray(image)
+    if pixels.ndim == 2:
+        pixels = pixels[..., np.newaxis]
+
+    if not np.issubdtype(target.dtype, np.floating):
+        np.copyto(target, pixels, casting="unsafe")
+        return
+    # (pixels / 255 - mean) / std == pixels * (1 / 255 / std) - mean / std
+    std_array = np.asarray(1.0 if std is None else std, dtype=target.dtype)
+    mean_array = np.asarray(0.0 if mean is None else mean, dtype=target.dtype)
+    np.multiply(pixels, 1 / 255 / std_array, out=target, casting="unsafe")
+    if mean_array.any():
+        np.subtract(target, mean_array / std_array, out=target)
+
+
+def stack_batch(  # pylint: disable=too-many-arguments
+    images: Sequence[Image],
+    size: Optional[Size] = None,
+    *,
+    dtype: npt.DTypeLike = np.float32,
+    layout: str = "NCHW",
+    mean: Normalization = None,
+    std: Normalization = None,
+    mode: str = "RGB",
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Returns the images as one contiguous batch array for a model
+
+    Each image is written directly into its slot of the batch. See `to_array`.
+
+    Example:
+
+    >>> images = [PIL.Image.new("RGB", (4, 2)), PIL.Image.new("RGB", (8, 4))]
+    >>> stack_batch(images, size=(4, 2), dtype=np.uint8).shape
+    (2, 3, 2, 4)
+
+    Args:
+        images (Sequence[Image]): The PIL Images or ImageValues
+        size (Optional[Size], optional): The (width, height) to resize to. Defaults to None,
+            i.e. the size of the first image.
+        dtype (npt.DTypeLike, optional): The dtype of the array. Defaults to np.float32.
+        layout (str, optional): 'NCHW' for channels first or 'NHWC' for channels last.
+            Defaults to 'NCHW'.
+        mean (Normalization, optional): The mean subtracted from the scaled values. One value
+            or one per channel. Defaults to None, i.e. 0.
+        std (Normalization, optional): The standard deviation the values are divided by. One
+            value or one per channel. Defaults to None, i.e. 1.
+        mode (str, optional): The PIL mode to convert the images to. Defaults to 'RGB'.
+        out (Optional[np.ndarray], optional): A preallocated array to write to. It must have the
+            shape and dtype of the result. Defaults to None, i.e. a new array is allocated.
+
+    Raises:
+        ValueError: If there are no images, the layout is not supported or the out array does
+            not fit
+
+    Returns:
+        np.ndarray: The batch array. It is the `out` array if provided
+    """
+    if layout not in ("NHWC", "NCHW"):
+        raise ValueError(f"The layout {layout!r} is not supported. Use 'NHWC' or 'NCHW'")
+    if not images:
+        raise ValueError("Please provide at least one image")
+    if size is None:
+        first = images[0]
+        size = (first.image if isinstance(first, ImageValue) else first).size
+    image_layout = layout[1:]
+    shape = (len(images), *_shape(tuple(size), PIL.Image.getmodebands(mode), image_layout))
+    if out is None:
+        out = np.empty(shape, dtype=dtype)
+    elif out.shape != shape or out.dtype != np.dtype(dtype):
+        raise ValueError(
+            f"The out array has shape {out.shape} and dtype {out.dtype}. Expected shape {shape} "
+            f"and dtype {np.dtype(dtype)}"
+        )
+    for index, image in enumerate(images):
+        to_array(
+            image,
+            size,
+            dtype=dtype,
+            layout=image_layout,
+            mean=mean,
+            std=std,
+            mode=mode,
+            out=out[index],
+        )
+    return out
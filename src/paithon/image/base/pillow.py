@@ -1,80 +1,549 @@
 """Tools for working with pillow"""
 import base64
+import binascii
+import hashlib
 import io
-import urllib
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 
 import panel as pn
 import param
 import PIL
-import requests
+
+from ...base.cache import URL_CACHE
+from ...base.content import CONTENT_STORE, ContentStore
+from ...base.http import HTTP_CLIENT
+
+
+Size = Tuple[int, int]
+# The modes supported by Image.reduce
+_REDUCE_MODES = ("L", "LA", "La", "RGB", "RGBA", "RGBa", "RGBX", "CMYK", "YCbCr", "I", "F")
+# The key of the source bytes and pixel digest of a decoded image in its info
+_SOURCE = "paithon_source"
+
+
+def _pixel_digest(image: PIL.Image.Image) -> bytes:
+    # Identifies the content of an image by its mode, size, pixels, palette and transparency
+    digest = hashlib.sha256(f"{image.mode}{image.size}".encode("utf8"))
+    digest.update(image.tobytes())
+    palette = image.getpalette()
+    if palette:
+        digest.update(bytes(palette))
+    transparency = image.info.get("transparency")
+    if transparency is not None:
+        digest.update(repr(transparency).encode("utf8"))
+    return digest.digest()
+
+
+def _keep_source(img: PIL.Image.Image, data: bytes) -> PIL.Image.Image:
+    # Keeps the encoded bytes with the decoded image together with a digest of its pixels, such
+    # that `image_to_bytes` can return them as long as the image is not modified
+    img.load()
+    img.info[_SOURCE] = (data, _pixel_digest(img))
+    return img
+
+
+def _source_bytes(img: PIL.Image.Image, img_format: str) -> Optional[bytes]:
+    source = img.info.get(_SOURCE)
+    if source is None or (img.format or "").upper() != img_format.upper():
+        return None
+    data, pixel_digest = source
+    # Computing the digest is much faster than encoding the image again
+    if _pixel_digest(img) != pixel_digest:
+        return None
+    return data
 
 
 # Currently False. Should be changed to True later
-def load_image_from_url(url: str, verify: bool = True) -> PIL.Image.Image:
+def load_image_from_url(
+    url: str, verify: bool = True, target_size: Optional[Size] = None
+) -> PIL.Image.Image:
     """Returns an image from from a url
 
+    Without a target_size the downloaded bytes are kept with the image. `image_to_bytes` and
+    the functions using it return them instead of encoding the image again, as long as the
+    image is not modified.
+
     Args:
         url (str): A url
         verify (bool, optional): Whether or not to verify ssl certificate. Defaults to False.
+        target_size (Optional[Size], optional): The (width, height) the image will be resized
+            to, for example by a model. If provided the image is decoded at a reduced
+            resolution close to but not smaller than the target_size. See
+            `image_from_bytes`. Defaults to None, i.e. the full resolution.
+
+    Returns:
+        PIL.Image.Image: The PIL Image
+    """
+    data = load_bytes_from_url(url, verify=verify)
+    if target_size is None:
+        return _keep_source(image_from_bytes(data), data)
+    return image_from_bytes(data, target_size)
+
+
+def load_bytes_from_url(url: str, verify: bool = True, cache: bool = True) -> bytes:
+    """Returns the contents of a url as bytes
+
+    Args:
+        url (str): A url
+        verify (bool, optional): Whether or not to verify ssl certificate. Defaults to True.
+        cache (bool, optional): Whether or not to use the URL_CACHE shared by all sessions.
+            Defaults to True.
+
+    Returns:
+        bytes: The contents. For example the encoded bytes of a .jpg file.
+    """
+    if cache:
+        return URL_CACHE.get(url, verify=verify)
+    return HTTP_CLIENT.get(url, verify=verify).content
+
+
+def load_images_from_urls(urls: Sequence[str], verify: bool = True) -> List[PIL.Image.Image]:
+    """Returns the images from the urls. The urls are downloaded concurrently.
+
+    Use it to for example warm the URL_CACHE with the images of an example gallery at startup.
+
+    Args:
+        urls (Sequence[str]): The urls
+        verify (bool, optional): Whether or not to verify ssl certificate. Defaults to True.
+
+    Returns:
+        List[PIL.Image.Image]: The PIL Images in the order of the urls
+    """
+    return HTTP_CLIENT.map(lambda url: load_image_from_url(url, verify=verify), urls)
+
+
+def data_uri_to_bytes(data_uri: str) -> bytes:
+    """Returns the decoded bytes of a base64 encoded data uri
+
+    Args:
+        data_uri (str): A data uri like 'data:image/png;base64,iVBORw0KGgo...'
+
+    Raises:
+        ValueError: If the data uri does not contain any data
+
+    Returns:
+        bytes: The decoded bytes
+    """
+    index = data_uri.find(",")
+    if index < 0:
+        raise ValueError("The data uri does not contain any data")
+    return binascii.a2b_base64(data_uri[index + 1 :])
+
+
+def image_from_bytes(
+    data: Union[bytes, memoryview], target_size: Optional[Size] = None
+) -> PIL.Image.Image:
+    """Returns an image from the encoded bytes of an image file.
+
+    A `bytes` value is shared with the underlying buffer, i.e. it is not copied.
+
+    If a target_size is provided the image is decoded at a reduced resolution. A JPEG is
+    decoded at 1/2, 1/4 or 1/8 of its size by the DCT scaling of `Image.draft`, which is much
+    faster than decoding the full resolution. The image is then reduced further by an integer
+    factor with `Image.reduce`. The result is never smaller than the target_size, i.e. it
+    should still be resized to the target_size.
+
+    Args:
+        data (Union[bytes, memoryview]): The encoded bytes. For example the contents of a .png file
+        target_size (Optional[Size], optional): The (width, height) the image will be resized
+            to. Defaults to None, i.e. the image is opened lazily at full resolution.
 
     Returns:
         PIL.Image.Image: The PIL Image
     """
-    return PIL.Image.open(requests.get(url, stream=True, verify=verify).raw)
+    img = PIL.Image.open(io.BytesIO(data))
+    if target_size is None:
+        return img
+    img.draft(img.mode, target_size)
+    factor = min(img.width // target_size[0], img.height // target_size[1])
+    if factor >= 2 and img.mode in _REDUCE_MODES:
+        img = img.reduce(factor)
+    return img
 
 
-def image_from_data_uri(data_url: str) -> PIL.Image.Image:
+def image_from_data_uri(data_url: str, target_size: Optional[Size] = None) -> PIL.Image.Image:
     """Returns an image from from a dataurl
 
+    Without a target_size the decoded bytes are kept with the image like by
+    `load_image_from_url`. Use `ImageValue.from_data_uri(data_url)` to also keep the data uri.
+
     Args:
         url (str): A dataurl
+        target_size (Optional[Size], optional): The (width, height) the image will be resized
+            to. If provided the image is decoded at a reduced resolution close to but not
+            smaller than the target_size. See `image_from_bytes`. Defaults to None, i.e. the
+            full resolution.
 
     Returns:
         PIL.Image.Image: The PIL Image
     """
-    return PIL.Image.open(urllib.request.urlopen(data_url).file)
+    data = data_uri_to_bytes(data_url)
+    if target_size is None:
+        return _keep_source(image_from_bytes(data), data)
+    return image_from_bytes(data, target_size)
+
+
+def image_to_bytes(
+    img: Union[PIL.Image.Image, "ImageValue"], img_format: Optional[str] = None
+) -> bytes:
+    """Returns the encoded bytes of the image
 
+    The bytes of an ImageValue and the source bytes of an unmodified image from
+    `load_image_from_url`, `image_from_data_uri` or `ImageValue.image` are returned without
+    encoding the image again, unless another format is requested.
 
-def image_to_base64_string(img: PIL.Image.Image) -> str:
+    Args:
+        img (Union[PIL.Image.Image, ImageValue]): The PIL Image or ImageValue to encode
+        img_format (Optional[str], optional): The format to encode to. For example 'PNG'.
+            Defaults to the format of the image or 'PNG' if it has no format.
+
+    Returns:
+        bytes: The encoded bytes
+    """
+    if isinstance(img, ImageValue):
+        if img_format is None or img.mime_type == f"image/{img_format.lower()}":
+            return img.data
+        img = img.image
+    img_format = img_format or img.format or "PNG"
+    source = _source_bytes(img, img_format)
+    if source is not None:
+        return source
+    buffered = io.BytesIO()
+    img.save(buffered, format=img_format)
+    return buffered.getvalue()
+
+
+def image_to_base64_string(img: Union[PIL.Image.Image, "ImageValue"]) -> str:
     """Returns a base64 encoded string
 
     Args:
-        img (PIL.Image.Image): The PIL Image to convert
+        img (Union[PIL.Image.Image, ImageValue]): The PIL Image or ImageValue to convert
 
     Returns:
         str: a base64 encoded string
     """
-    buffered = io.BytesIO()
-    img.save(buffered, format=img.format)
-    return base64.b64encode(buffered.getvalue()).decode("utf-8")
+    return base64.b64encode(image_to_bytes(img)).decode("utf-8")
 
 
-def image_to_data_uri(img: PIL.Image.Image) -> str:
+def image_to_data_uri(img: Union[PIL.Image.Image, "ImageValue"]) -> str:
     """Returns a base64 encoded data uri for use as the src attribute of an img tag
 
+    An image without a format, for example a generated or processed image, is encoded as PNG.
+    The data uri of an ImageValue is reused.
+
     Args:
-        img (PIL.Image.Image): The PIL Image to convert
+        img (Union[PIL.Image.Image, ImageValue]): The PIL Image or ImageValue to convert
 
     Returns:
         str: A base64 encoded data uri
     """
-    img_format = img.format.lower()
-    return f"data:image/{img_format};base64," + image_to_base64_string(img)
+    if isinstance(img, ImageValue):
+        return img.data_uri
+    img_format = img.format or "PNG"
+    data = base64.b64encode(image_to_bytes(img, img_format)).decode("utf-8")
+    return f"data:image/{img_format.lower()};base64," + data
+
+
+class ImageValue:
+    """An ImageValue carries the encoded bytes, the decoded PIL Image and the data uri of an
+    image together.
+
+    Each representation is computed at most once and only when it is first needed. Pass the
+    ImageValue around instead of converting between the representations again and again.
+
+    An ImageValue is immutable. Do not modify its image in place. Copy it first and create a
+    new ImageValue from the copy.
+
+    Example:
+
+    >>> value = ImageValue.from_data_uri("data:image/png;base64,iVBORw0KGgo=")
+    >>> value.mime_type, value.data
+    ('image/png', b'\\x89PNG\\r\\n\\x1a\\n')
+    """
+
+    def __init__(
+        self,
+        data: Optional[bytes] = None,
+        image: Optional[PIL.Image.Image] = None,
+        data_uri: str = "",
+        mime_type: str = "",
+    ):
+        if data is None and image is None and not data_uri:
+            raise ValueError("Please provide the data, the image or the data_uri")
+        self._data = data
+        self._image = image
+        self._data_uri = data_uri
+        self._mime_type = mime_type
+        self._content_hash = ""
+        self._previews: Dict[tuple, "ImageValue"] = {}
+
+    @classmethod
+    def from_bytes(cls, data: bytes, mime_type: str = "") -> "ImageValue":
+        """Returns an ImageValue from the encoded bytes of an image
+
+        Args:
+            data (bytes): The encoded bytes. For example the contents of a .png file
+            mime_type (str, optional): The mime type. For example 'image/png'. If not provided
+                it is determined from the data when needed.
+
+        Returns:
+            ImageValue: The ImageValue
+        """
+        return cls(data=data, mime_type=mime_type)
+
+    @classmethod
+    def from_data_uri(cls, data_uri: str) -> "ImageValue":
+        """Returns an ImageValue from a base64 encoded data uri
+
+        Args:
+            data_uri (str): A data uri like 'data:image/png;base64,iVBORw0KGgo...'
+
+        Returns:
+            ImageValue: The ImageValue
+        """
+        mime_type = data_uri[5 : data_uri.find(";")] if data_uri.startswith("data:") else ""
+        return cls(data_uri=data_uri, mime_type=mime_type)
+
+    @classmethod
+    def from_image(cls, image: PIL.Image.Image) -> "ImageValue":
+        """Returns an ImageValue from a PIL Image
+
+        The source bytes of an unmodified image decoded by an ImageValue, `load_image_from_url`
+        or `image_from_data_uri` are reused, i.e. the image is not encoded again and keeps its
+        content hash.
+
+        Args:
+            image (PIL.Image.Image): The PIL Image
+
+        Returns:
+            ImageValue: The ImageValue
+        """
+        return cls(data=_source_bytes(image, image.format or "PNG"), image=image)
+
+    @property
+    def data(self) -> bytes:
+        """Returns the encoded bytes of the image"""
+        if self._data is None:
+            if self._data_uri:
+                self._data = data_uri_to_bytes(self._data_uri)
+            else:
+                self._data = image_to_bytes(self.image, self.image.format or "PNG")
+        return self._data
+
+    @property
+    def image(self) -> PIL.Image.Image:
+        """Returns the PIL Image. It is decoded from the data the first time it is needed"""
+        if self._image is None:
+            self._image = _keep_source(image_from_bytes(self.data), self.data)
+        return self._image
+
+    @property
+    def mime_type(self) -> str:
+        """Returns the mime type of the encoded bytes. For example 'image/png'"""
+        if not self._mime_type:
+            self._mime_type = "image/" + (self.image.format or "PNG").lower()
+        return self._mime_type
+
+    @property
+    def content_hash(self) -> str:
+        """Returns a sha256 hex digest identifying the content of the image.
+
+        It is computed from the encoded bytes when they are known. For an image created from a
+        PIL Image without encoded bytes it is computed from the mode, size, pixels, palette and
+        transparency to avoid encoding the image.
+        """
+        if not self._content_hash:
+            if self._data is None and not self._data_uri:
+                self._content_hash = _pixel_digest(self.image).hex()
+            else:
+                self._content_hash = hashlib.sha256(self.data).hexdigest()
+        return self._content_hash
+
+    @property
+    def data_uri(self) -> str:
+        """Returns a base64 encoded data uri for use as the src attribute of an img tag"""
+        if not self._data_uri:
+            self._data_uri = (
+                f"data:{self.mime_type};base64," + base64.b64encode(self.data).decode("utf-8")
+            )
+        return self._data_uri
+
+    def src(self, store: ContentStore = CONTENT_STORE) -> str:
+        """Returns the src attribute of an img tag showing the image.
+
+        If the endpoint of the store is served the image is added to the store and its content
+        addressed url is returned. Otherwise the data uri is returned.
+
+        Args:
+            store (ContentStore, optional): The store. Defaults to the shared CONTENT_STORE.
+
+        Returns:
+            str: The url or data uri
+        """
+        if not store.serving:
+            return self.data_uri
+        content_id = store.add(self.data, self.mime_type, self.content_hash)
+        return store.url(content_id)
+
+    def preview(self, encoding: Optional["DisplayEncoding"] = None) -> "ImageValue":
+        """Returns a compact version of the image for display. The preview is computed once per
+        encoding policy. The ImageValue itself is not changed, i.e. a model still gets the
+        original.
+
+        Args:
+            encoding (Optional[DisplayEncoding], optional): The encoding policy. Defaults to
+                None, i.e. the shared DISPLAY_ENCODING.
+
+        Returns:
+            ImageValue: The preview. It is the ImageValue itself if no preview is needed.
+        """
+        encoding = encoding or DISPLAY_ENCODING
+        key = encoding.key()
+        if key not in self._previews:
+            self._previews[key] = encoding.encode(self)
+        return self._previews[key]
+
+
+def _can_save(img_format: str) -> bool:
+    PIL.Image.init()
+    return img_format in PIL.Image.SAVE
+
+
+def _has_alpha(image: PIL.Image.Image) -> bool:
+    return image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+
+
+class DisplayEncoding(param.Parameterized):
+    """A policy for encoding compact previews of images for display in the browser.
+
+    Large images are downscaled to `max_dimension` and encoded with the first supported format
+    of `formats`. Images already small enough are displayed as they are.
+
+    Use the shared `DISPLAY_ENCODING` instance or create one per component.
+
+    Example:
+
+    >>> encoding = DisplayEncoding(formats=["JPEG"], max_dimension=64, min_size=0)
+    >>> preview = ImageValue.from_image(PIL.Image.new("RGB", (256, 128))).preview(encoding)
+    >>> preview.mime_type, preview.image.size
+    ('image/jpeg', (64, 32))
+    """
+
+    formats = param.List(
+        ["AVIF", "WEBP", "JPEG"],
+        item_type=str,
+        doc="""
+    The formats in order of preference. Formats the installed Pillow cannot encode are skipped.
+    Images with transparency skip formats without an alpha channel like JPEG. PNG is used if no
+    format can be used.""",
+    )
+    quality = param.Integer(
+        80,
+        bounds=(1, 100),
+        doc="""
+    The quality of the lossy formats from 1 (worst) to 100 (best).""",
+    )
+    max_dimension = param.Integer(
+        1920,
+        bounds=(1, None),
+        allow_None=True,
+        doc="""
+    Images wider or taller than max_dimension pixels are downscaled keeping the aspect ratio.
+    None means no downscaling.""",
+    )
+    min_size = param.Integer(
+        512 * 1024,
+        bounds=(0, None),
+        doc="""
+    Images with encoded bytes smaller than min_size are displayed as they are if they are not
+    larger than max_dimension. Re-encoding them saves little.""",
+    )
+
+    def key(self) -> tuple:
+        """Returns a key identifying the policy"""
+        return (tuple(self.formats), self.quality, self.max_dimension, self.min_size)
+
+    def format_for(self, image: PIL.Image.Image) -> str:
+        """Returns the format to encode the image to
+
+        Args:
+            image (PIL.Image.Image): The image
+
+        Returns:
+            str: The format. For example 'WEBP'
+        """
+        alpha = _has_alpha(image)
+        for img_format in self.formats:
+            img_format = img_format.upper()
+            if alpha and img_format in ("JPEG", "BMP"):
+                continue
+            if _can_save(img_format):
+                return img_format
+        return "PNG"
+
+    def encode(self, value: ImageValue) -> ImageValue:
+        """Returns the preview of the image
+
+        Args:
+            value (ImageValue): The image
+
+        Returns:
+            ImageValue: The preview. It is the value itself if it is already small enough or
+                animated
+        """
+        image = value.image
+        if getattr(image, "is_animated", False):
+            return value
+        too_large = self.max_dimension is not None and max(image.size) > self.max_dimension
+        if not too_large and (
+            image.format in [img_format.upper() for img_format in self.formats]
+            or len(value.data) < self.min_size
+        ):
+            return value
+
+        img_format = self.format_for(image)
+        if too_large:
+            scale = self.max_dimension / max(image.size)
+            size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+            image = image.resize(size, PIL.Image.LANCZOS, reducing_gap=3.0)
+        mode = "RGBA" if img_format != "JPEG" and _has_alpha(image) else "RGB"
+        if image.mode != mode:
+            image = image.convert(mode)
+        buffered = io.BytesIO()
+        image.save(buffered, format=img_format, quality=self.quality)
+        data = buffered.getvalue()
+        if not too_large and len(data) >= len(value.data):
+            return value
+        return ImageValue(data=data, mime_type=f"image/{img_format.lower()}")
+
+
+DISPLAY_ENCODING = DisplayEncoding()
 
 
 class ImageViewer(pn.reactive.ReactiveHTML):
     """An ImageViewer for PIL Images"""
 
     image = param.ClassSelector(
-        class_=PIL.Image.Image,
+        class_=(PIL.Image.Image, ImageValue),
         precedence=-1,
         doc="""
-    A PIL Image""",
+    A PIL Image or an ImageValue""",
     )
     data_url = param.String(
         constant=True,
         doc="""
-    Used to transfer the image to the client and view it""",
+    Used to transfer the image to the client and view it. It is the url of the image on the
+    CONTENT_STORE endpoint if served. Otherwise it is a data uri.""",
+    )
+    display_encoding = param.ClassSelector(
+        class_=DisplayEncoding,
+        default=DISPLAY_ENCODING,
+        instantiate=False,
+        allow_None=True,
+        precedence=-1,
+        doc="""
+    The policy for encoding a compact preview of the image for display. Defaults to the shared
+    DISPLAY_ENCODING. None means the image is displayed as it is.""",
     )
 
     _template = (
@@ -88,10 +557,17 @@ class ImageViewer(pn.reactive.ReactiveHTML):
         super().__init__(image=image, height=height, **params)
         self._update_data_url()
 
-    @param.depends("image", watch=True)
+    @param.depends("image", "display_encoding", watch=True)
     def _update_data_url(self):
         with param.edit_constant(self):
-            if self.image:
-                self.data_url = image_to_data_uri(self.image)
+            if isinstance(self.image, ImageValue):
+                self.data_url = self._preview(self.image).src()
+            elif self.image:
+                self.data_url = self._preview(ImageValue.from_image(self.image)).src()
             else:
                 self.data_url = ""
+
+    def _preview(self, value: ImageValue) -> ImageValue:
+        if self.display_encoding is None:
+            return value
+        return value.preview(self.display_encoding)
@@ -1,8 +1,11 @@
 """Provides the IMAGE_EXAMPLES list of ImageExamples"""
+from typing import List, Optional, Sequence
+
 import param
 import PIL
 
-from .base.pillow import image_to_data_uri, load_image_from_url
+from ..base.http import HTTP_CLIENT
+from .base.pillow import DisplayEncoding, ImageValue, load_bytes_from_url
 
 
 class ImageExample(param.Parameterized):
@@ -13,7 +16,19 @@ class ImageExample(param.Parameterized):
     def __init__(self, **params):
         super().__init__(**params)
 
-        self._image = None
+        self._image_value = None
+
+    @property
+    def image_value(self) -> ImageValue:
+        """Return the ImageValue of the example. It is loaded from the url the first time it is
+        needed
+
+        Returns:
+            ImageValue: An ImageValue
+        """
+        if not self._image_value and self.url:
+            self._image_value = ImageValue.from_bytes(load_bytes_from_url(self.url))
+        return self._image_value
 
     @property
     def image(self) -> PIL.Image.Image:
@@ -22,9 +37,9 @@ class ImageExample(param.Parameterized):
         Returns:
             PIL.Image.Image: A PIL Image
         """
-        if not self._image and self.url:
-            self._image = load_image_from_url(self.url)
-        return self._image
+        if not self.image_value:
+            return None
+        return self.image_value.image
 
     @property
     def data_uri(self) -> str:
@@ -33,7 +48,34 @@ class ImageExample(param.Parameterized):
         Returns:
             String: a data_uri
         """
-        return image_to_data_uri(self.image)
+        return self.image_value.data_uri
+
+    @property
+    def loaded(self) -> bool:
+        """Returns True if the image has been loaded"""
+        return self._image_value is not None
+
+    def prewarm(
+        self, data: Optional[bytes] = None, encoding: Optional[DisplayEncoding] = None
+    ) -> Optional[ImageValue]:
+        """Loads the image unless already loaded and precomputes the preview displayed by the
+        components. See `ImageValue.preview`.
+
+        Args:
+            data (Optional[bytes], optional): The contents of the url if already downloaded.
+                Defaults to None, i.e. they are downloaded if needed.
+            encoding (Optional[DisplayEncoding], optional): The encoding policy of the preview.
+                Defaults to None, i.e. the shared DISPLAY_ENCODING.
+
+        Returns:
+            Optional[ImageValue]: The ImageValue or None if the example has no url
+        """
+        if self._image_value is None and data is not None:
+            self._image_value = ImageValue.from_bytes(data)
+        image_value = self.image_value
+        if image_value:
+            image_value.preview(encoding).src()
+        return image_value
 
 
 IMAGE_EXAMPLES = [
@@ -50,3 +92,28 @@ IMAGE_EXAMPLES = [
         name="Palace",
     ),
 ]
+
+
+def prewarm_examples(
+    examples: Optional[Sequence[ImageExample]] = None, encoding: Optional[DisplayEncoding] = None
+) -> List[ImageExample]:
+    """Loads the images of the examples concurrently and precomputes the previews displayed by
+    the components. Examples already loaded are not downloaded again.
+
+    Args:
+        examples (Optional[Sequence[ImageExample]], optional): The examples. Defaults to None,
+            i.e. the IMAGE_EXAMPLES.
+        encoding (Optional[DisplayEncoding], optional): The encoding policy of the previews.
+            Defaults to None, i.e. the shared DISPLAY_ENCODING.
+
+    Returns:
+        List[ImageExample]: The examples
+    """
+    examples = list(IMAGE_EXAMPLES if examples is None else examples)
+    pending = [example for example in examples if not example.loaded and example.url]
+    contents = HTTP_CLIENT.map(load_bytes_from_url, [example.url for example in pending])
+    for example, data in zip(pending, contents):
+        example.prewarm(data, encoding)
+    for example in examples:
+        example.prewarm(encoding=encoding)
+    return examples
@@ -1,20 +1,38 @@
 """A Module of tools for Image Classification"""
+import asyncio
+import inspect
 import random
-from typing import Any, Dict, List, Tuple
+import threading
+from concurrent.futures import Future
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
-import holoviews as hv
 import panel as pn
 import param
 from PIL import Image
 
-from ..base.classification import ClassificationPlot
-from ..base.component import extract_layout_parameters
+from ..base.batching import BatchScheduler
+from ..base.cache import PREDICTION_CACHE, PredictionCache
+from ..base.classification import ClassificationPlot, top_k_output_json
+from ..base.component import call_soon, extract_layout_parameters
 from ..base.svgs import IMAGE_CLASSIFIER_ICON
-from ..shared.template import ACCENT_COLOR
-from .examples import IMAGE_EXAMPLES, load_image_from_url
+from ..shared.template import ACCENT_COLOR, load_extension
+from .base.pillow import ImageValue, load_bytes_from_url
+from .examples import IMAGE_EXAMPLES, ImageExample, prewarm_examples
 from .widgets.image_input import ImageInput
 
-hv.extension("bokeh")
+_HOLOVIEWS_EXTENSION_LOADED = False
+
+
+def _load_holoviews_extension():
+    # HoloViews takes seconds to import. So it is loaded when the first ImageClassifier is
+    # created instead of when this module is imported.
+    global _HOLOVIEWS_EXTENSION_LOADED  # pylint: disable=global-statement
+    if not _HOLOVIEWS_EXTENSION_LOADED:
+        import holoviews as hv  # pylint: disable=import-outside-toplevel
+
+        hv.extension("bokeh")
+        _HOLOVIEWS_EXTENSION_LOADED = True
 
 
 # pylint: disable=unused-argument
@@ -59,14 +77,52 @@ class ImageClassifier(pn.viewable.Viewer):  # pylint: disable=too-many-instance-
     example = param.Selector(IMAGE_EXAMPLES, label="example")
     accent_color = param.Color(ACCENT_COLOR)
 
-    model = param.Parameter()
+    model = param.Parameter(
+        doc="""
+    A function taking a PIL Image and returning the inputs, outputs and classification. The
+    classification is a list of dicts with a 'label' and a 'score' or a (labels, scores) pair of
+    NumPy arrays. Can also be an `async def` function or a BatchScheduler running a batched
+    model on the images of all sessions.""",
+    )
+    top_k = param.Integer(
+        5,
+        bounds=(1, None),
+        allow_None=True,
+        doc="""
+    The number of labels with the highest scores to show. If None all labels are shown.""",
+    )
+    executor = param.Parameter(
+        doc="""
+    An optional concurrent.futures.Executor to run the model in. For example a
+    ThreadPoolExecutor or a ProcessPoolExecutor. If provided the session is not blocked while
+    the model runs. An `async def` model is always awaited on the event loop of the session.""",
+    )
+    prediction_cache = param.ClassSelector(
+        class_=PredictionCache,
+        doc="""
+    An optional cache of the results of the model keyed by the content of the image. Provide
+    the shared PREDICTION_CACHE to reuse the results across all sessions. Default is None, i.e.
+    no caching.""",
+    )
+    running = param.Boolean(
+        constant=True,
+        doc="""
+    True while the model runs in the executor or is awaited.""",
+    )
 
     image = param.Parameter()
 
     computation_time = param.Number()
     inputs = param.Parameter()
     outputs = param.Parameter()
-    output_json = param.List()
+    classification = param.Parameter(
+        doc="""
+    The full classification returned by the model."""
+    )
+    output_json = param.List(
+        doc="""
+    The top_k labels and scores of the classification sorted by descending score."""
+    )
 
     plot = param.Parameter()
     layout_example = param.Parameter()
@@ -76,10 +132,16 @@ class ImageClassifier(pn.viewable.Viewer):  # pylint: disable=too-many-instance-
     _updating = param.Boolean()
 
     def __init__(self, **params):
+        load_extension()
+        _load_holoviews_extension()
         params, layout_params = extract_layout_parameters(params)
         if "min_height" not in layout_params:
             layout_params["min_height"] = 640
         super().__init__(**params, layout_container=pn.Column(**layout_params))
+        self._image_value = None
+        self._model_run = 0
+        self._model_future = None
+        self._model_cache_key = ""
 
         self.layout_json = pn.pane.JSON(
             depth=2,
@@ -94,7 +156,7 @@ class ImageClassifier(pn.viewable.Viewer):  # pylint: disable=too-many-instance-
         def _update_image_from_upload(value):
             if value:
                 self._updating = True
-                self.image = self.layout_image_input.get_pil_image()
+                self._set_image_value(self.layout_image_input.get_image_value())
                 self._updating = False
 
         if len(IMAGE_EXAMPLES) <= 3:
@@ -127,25 +189,179 @@ class ImageClassifier(pn.viewable.Viewer):  # pylint: disable=too-many-instance-
     def __panel__(self):
         return self.layout_container
 
+    @staticmethod
+    def prewarm(
+        model: Any = None,
+        prediction_cache: PredictionCache = PREDICTION_CACHE,
+        examples: Optional[Sequence[ImageExample]] = None,
+        background: bool = True,
+    ) -> Future:
+        """Loads the example images, precomputes their previews and, given a model, caches
+        their predictions. Call it once when the server starts, for example from a `panel serve
+        --setup` script or `pn.state.onload`, so the first sessions do not have to wait.
+
+        Sessions reuse the predictions if they are created with the same `model` and
+        `prediction_cache`. Examples already in the `prediction_cache` are skipped, i.e. the
+        model only runs once per example no matter how many times prewarm is called.
+
+        Example:
+
+        >>> ImageClassifier.prewarm(model, prediction_cache=PREDICTION_CACHE) # doctest: +SKIP
+        >>> ImageClassifier(model=model, prediction_cache=PREDICTION_CACHE) # doctest: +SKIP
+
+        Args:
+            model (Any, optional): The model of the ImageClassifiers. Defaults to None, i.e. no
+                predictions.
+            prediction_cache (PredictionCache, optional): The cache to store the predictions in.
+                Defaults to the shared PREDICTION_CACHE.
+            examples (Optional[Sequence[ImageExample]], optional): The examples. Defaults to
+                None, i.e. the IMAGE_EXAMPLES.
+            background (bool, optional): Whether or not to run in a background thread.
+                Defaults to True.
+
+        Returns:
+            Future: A future of the list of examples
+        """
+        future: Future = Future()
+
+        def run():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                prewarmed = prewarm_examples(examples)
+                for example in prewarmed if model else []:
+                    image_value = example.image_value
+                    if not image_value:
+                        continue
+                    # For example if prewarm runs again on `pn.state.onload`
+                    if prediction_cache.get(model, image_value.content_hash) is not None:
+                        continue
+                    if inspect.iscoroutinefunction(model):
+                        result = asyncio.run(model(image_value.image))
+                    else:
+                        result = model(image_value.image)
+                    prediction_cache.set(model, image_value.content_hash, result)
+            except Exception as ex:  # pylint: disable=broad-except
+                future.set_exception(ex)
+            else:
+                future.set_result(prewarmed)
+
+        if background:
+            threading.Thread(target=run, name="paithon-prewarm", daemon=True).start()
+        else:
+            run()
+        return future
+
     def load_image(self, url: str):
         """Loads an image from an url
 
         Args:
             url (str): The url to load
         """
-        self.image = load_image_from_url(url)
+        self._set_image_value(ImageValue.from_bytes(load_bytes_from_url(url)))
+
+    def _set_image_value(self, image_value: ImageValue):
+        self._image_value = image_value
+        self.image = image_value.image
+
+    def _get_image_value(self) -> ImageValue:
+        # The image may have been set directly by the user
+        if self._image_value is None or self._image_value.image is not self.image:
+            self._image_value = ImageValue.from_image(self.image)
+        return self._image_value
 
     @param.depends("image", watch=True)
     def _update_image(self):
-        if not self._updating:
-            self.layout_image_input.set_value_from_pillow_image(self.image)
+        if self._updating:
+            return
+        if self.image is None:
+            self.layout_image_input.set_value_from_data_uri("")
+        else:
+            self.layout_image_input.set_value_from_image_value(self._get_image_value())
 
     @param.depends("image", watch=True)
     def _run_model(self):
-        if self.model:
-            self.inputs, self.outputs, self.output_json = self.model(self.image)
+        # Results of previous runs still in progress are stale and dropped
+        self._model_run += 1
+        run = self._model_run
+        if self._model_future is not None:
+            self._model_future.cancel()
+            self._model_future = None
+
+        cached_result = self._get_cached_result()
+        if not self.model or cached_result is not None:
+            self._apply_model_result(run, cached_result or (None, None, []))
+            self._finish_run(run)
+        elif inspect.iscoroutinefunction(self.model):
+            self._set_running(True)
+            call_soon(partial(self._run_model_async, run, self.image))
+        elif isinstance(self.model, BatchScheduler):
+            self._run_model_in_future(run, self.model.submit)
+        elif self.executor is not None:
+            self._run_model_in_future(run, partial(self.executor.submit, self.model))
+        else:
+            self._apply_model_result(run, self.model(self.image))
+            self._finish_run(run)
+
+    def _run_model_in_future(self, run: int, submit: Callable[[Image.Image], Future]):
+        doc = pn.state.curdoc
+        future = self._model_future = submit(self.image)
+        # Only set after submit succeeded. Otherwise running would never be reset
+        self._set_running(True)
+        future.add_done_callback(
+            lambda future: call_soon(partial(self._apply_model_future, run, future), doc)
+        )
+
+    async def _run_model_async(self, run: int, image: Image.Image):
+        if run != self._model_run:
+            return
+        try:
+            result = await self.model(image)
+        finally:
+            self._finish_run(run)
+        self._apply_model_result(run, result)
+
+    def _apply_model_future(self, run: int, future):
+        if future.cancelled():
+            return
+        try:
+            result = future.result()
+        finally:
+            self._finish_run(run)
+        self._apply_model_result(run, result)
+
+    def _get_cached_result(self) -> Optional[Tuple[Any, Any, List[Dict]]]:
+        self._model_cache_key = ""
+        if self.prediction_cache is None or not self.model or self.image is None:
+            return None
+        self._model_cache_key = self._get_image_value().content_hash
+        return self.prediction_cache.get(self.model, self._model_cache_key)
+
+    def _apply_model_result(self, run: int, result: Tuple[Any, Any, List[Dict]]):
+        if run == self._model_run:
+            if self._model_cache_key:
+                self.prediction_cache.set(self.model, self._model_cache_key, result)
+            self.inputs, self.outputs, self.classification = result
+
+    def _finish_run(self, run: int):
+        if run == self._model_run:
+            self._model_future = None
+            self._set_running(False)
+
+    def _set_running(self, running: bool):
+        with param.edit_constant(self):
+            self.running = running
+
+    @param.depends("running", watch=True)
+    def _update_loading(self):
+        self.layout_plot.loading = self.layout_json.loading = self.running
+
+    @param.depends("classification", "top_k", watch=True)
+    def _update_output_json(self):
+        if self.classification is None or len(self.classification) == 0:
+            self.output_json = []
         else:
-            self.inputs, self.outputs, self.output_json = None, None, []
+            self.output_json = top_k_output_json(self.classification, self.top_k)
 
     @param.depends("output_json", watch=True)
     def _update_json(self):
@@ -154,7 +370,7 @@ class ImageClassifier(pn.viewable.Viewer):  # pylint: disable=too-many-instance-
 
     @param.depends("example", watch=True)
     def _update_image_from_example(self):
-        self.image = self.example.image
+        self._set_image_value(self.example.image_value)
 
     @pn.depends("accent_color", watch=True)
     def _handle_color_change(self):
@@ -1,2 +1,10 @@
 """Image Widgets"""
-from .image_input import ImageInput
+from typing import TYPE_CHECKING
+
+from ...base.lazy import lazy_getattr
+
+if TYPE_CHECKING:  # Lets linters and IDEs resolve the lazily imported names
+    from .image_input import ImageInput
+
+__all__ = ["ImageInput"]
+__getattr__ = lazy_getattr(__name__, {"ImageInput": ".image_input"})
@@ -35,22 +35,22 @@ render=()=>{
   }
   function handleFiles(files) {
     for (var i = 0, len = files.length; i < len; i++) {
-      if (validateImage(files[i]))
-        previewAnduploadImage(files[i]);
+      if (validateType(files[i])){
+        resizeImage(files[i]).then(function(image){
+          if (validateSize(image))
+            previewAnduploadImage(image);
+        }).catch(function(error){
+          // For example a corrupt file or a format the browser cannot decode
+          showMessage("The image could not be read: " + error.message)
+        })
+      }
     }
   }
   const msgElement=drop_message
   const dt=data
-  function setUri(uri){
-    data.progress=50
-    data.uri=uri;
-    const [, mime_type="",, value=""] = uri.split(/[:;,]/, 4)
-    data.mime_type=mime_type
-    data.progress=0
-  }
   function showMessage(msg){
+    state.transfer = null
     imageRegion.src = "";
-    dt.uri=""
     dt.filename=""
     dt.mime_type=""
 
@@ -68,32 +68,95 @@ render=()=>{
       showMessage("<em>Drag & Drop</em> images or <em>click</em> to upload")
     }
   }
-  showImage(data.uri)
   state.showImage=showImage
-  function validateImage(image) {
-    // check the type
+  // The images the client has by content id. Images are only sent by the server if the client
+  // does not have them. The least recently used images are evicted in the same order as on the
+  // server.
+  state.images = new Map()
+  function rememberImage(id, url){
+    state.images.delete(id)
+    state.images.set(id, url)
+    while (state.images.size > dt._cache_size){
+      const [oldId, oldUrl] = state.images.entries().next().value
+      state.images.delete(oldId)
+      if (oldUrl.startsWith("blob:") && oldUrl !== imageRegion.src){URL.revokeObjectURL(oldUrl)}
+    }
+  }
+  state.rememberImage = rememberImage
+  function display(){
+    const image = dt._display
+    if (!image || !image.id){
+      // The server clears the image when an upload starts
+      if (!state.transfer){showImage("")}
+      return
+    }
+    if (image.uri){
+      rememberImage(image.id, image.uri)
+      showImage(image.uri)
+    } else if (state.images.has(image.id)){
+      const url = state.images.get(image.id)
+      rememberImage(image.id, url)
+      showImage(url)
+    } else {
+      dt._missing = image.id
+    }
+  }
+  state.display = display
+  display()
+  function validateType(image) {
     var validTypes = Array.from(dt.accept, (x)=>{return "image/"+x});
     if (validTypes.indexOf( image.type ) === -1) {
       showMessage("File type '" + image.type + "' is  not accepted!");
       return false;
     }
-
-    // check the size
+    return true;
+  }
+  function validateSize(image) {
     if (image.size > dt.max_size_in_mega_bytes*1000000) {
       showMessage("File too large. Max is " + String(dt.max_size_in_mega_bytes) + "MB");
       return false;
     }
-
     return true;
   }
+  function resizeImage(image) {
+    // Downscales and re-encodes the image through a canvas before it is uploaded
+    const format = dt.target_format
+    if (!dt.max_dimension && format === "original"){return Promise.resolve(image)}
+    return createImageBitmap(image).then(function(bitmap) {
+      const size = Math.max(bitmap.width, bitmap.height)
+      const scale = dt.max_dimension ? Math.min(1, dt.max_dimension / size) : 1
+      if (scale === 1 && format === "original"){return image}
+      const canvas = document.createElement("canvas")
+      canvas.width = Math.max(1, Math.round(bitmap.width * scale))
+      canvas.height = Math.max(1, Math.round(bitmap.height * scale))
+      canvas.getContext("2d").drawImage(bitmap, 0, 0, canvas.width, canvas.height)
+      bitmap.close()
+      const type = format === "original" ? image.type : "image/" + format
+      return new Promise(function(resolve, reject) {
+        canvas.toBlob(function(blob) {
+          if (!blob){
+            reject(new Error("It could not be encoded as " + type))
+            return
+          }
+          // The browser falls back to png if it cannot encode the requested type
+          const name = image.name.replace(/\.[^.]*$/, "") + "." + blob.type.split("/")[1]
+          resolve(new File([blob], name, {type: blob.type}))
+        }, type, dt.quality)
+      })
+    })
+  }
   function previewAnduploadImage(image) {
-    var reader = new FileReader();
-    reader.onload = function(e) {
-      setUri(e.target.result);
-      showImage(e.target.result);
-    }
-    reader.readAsDataURL(image);
-    data.filename=image.name
+    // The file is sent in chunks of data.chunk_size bytes. See transfer.js
+    data.filename = image.name
+    data.mime_type = image.type
+    const remembered = Array.from(state.images.values())
+    if (state.objectUrl && !remembered.includes(state.objectUrl)){URL.revokeObjectURL(state.objectUrl)}
+    const objectUrl = URL.createObjectURL(image)
+    state.objectUrl = objectUrl
+    showImage(objectUrl)
+    state.startTransfer(image, {}, function(ack){
+      if (ack.content_id){state.rememberImage(ack.content_id, objectUrl)}
+    })
   }
   dropRegion.addEventListener('drop', handleDrop, false);
 }
@@ -104,6 +167,9 @@ fit=()=>{
 accept=()=>{
   state.fakeInput.accept = Array.from(data.accept, (x)=>{return "."+x}).toString();
 }
-uri=()=>{
-  state.showImage(data.uri)
+_display=()=>{
+  state.display()
+}
+cancel=()=>{
+  state.transfer = null
 }
@@ -1,13 +1,21 @@
 """The ImageInput can be used get and show an image from the user."""
-from base64 import b64decode
+from typing import Dict, Optional
 
 import panel as pn
 import param
 import PIL
 
+from ...base.cache import LRUCache
 from ...base.component import get_theme
-from ...base.reactive import read_scripts
-from ..base.pillow import image_from_data_uri, image_to_data_uri
+from ...base.reactive import merge_scripts, read_scripts
+from ...base.transfer import TRANSFER_SCRIPTS, ChunkReceiver
+from ..base.pillow import (
+    DISPLAY_ENCODING,
+    DisplayEncoding,
+    ImageValue,
+    Size,
+    image_from_bytes,
+)
 
 
 class ImageInput(pn.reactive.ReactiveHTML):
@@ -19,13 +27,13 @@ class ImageInput(pn.reactive.ReactiveHTML):
     value = param.Parameter(
         # constant=True,
         precedence=-1,
-        doc="""The base64-enconded contents of \
+        doc="""The raw, binary contents of \
 the file or files that were loaded.
 
-If `multiple` is set to False (default), this value is a single string with the contents
+If `multiple` is set to False (default), this value is a single bytes object with the contents
 of the single file that was chosen.
 
-If `multiple` is True, this value is a list of strings, each containing the contents of
+If `multiple` is True, this value is a list of bytes objects, each containing the contents of
 one of the multiple files that were chosen.
 
 The sequence of files is given by the list of filenames (see below).""",
@@ -55,6 +63,30 @@ The sequence of files is given by the list of filenames (see below).""",
     Maximum file size in Mega Bytes.
     """,
     )
+    max_dimension = param.Integer(
+        default=None,
+        bounds=(1, None),
+        doc="""
+    If set, images wider or taller than max_dimension pixels are downscaled in the browser
+    before they are uploaded. The aspect ratio is kept. The size check against
+    max_size_in_mega_bytes is done after the downscaling.
+    """,
+    )
+    target_format = param.Selector(
+        default="original",
+        objects=["original", "jpeg", "png", "webp"],
+        doc="""
+    The format the browser re-encodes the image to before it is uploaded. Default is 'original',
+    i.e. the image is only re-encoded if it is downscaled.
+    """,
+    )
+    quality = param.Number(
+        0.92,
+        bounds=(0.0, 1.0),
+        doc="""
+    A number between 0 and 1 indicating the quality of a re-encoded 'jpeg' or 'webp' image.
+    """,
+    )
     fit = param.Selector(
         default="contain",
         objects=["contain", "fill"],
@@ -66,9 +98,22 @@ The sequence of files is given by the list of filenames (see below).""",
         constant=True,
         bounds=(0, 100),
         doc="""
-    The progress of the image file transfer.
+    The progress of the image file transfer in percent.
+    """,
+    )
+    chunk_size = param.Integer(
+        256 * 1024,
+        bounds=(1024, None),
+        doc="""
+    The number of bytes sent per message when uploading a file. The file is transferred in
+    chunks to avoid blocking the server while one huge message is parsed.
     """,
     )
+    cancel = param.Event(
+        doc="""
+    If activated the upload in progress is cancelled.
+    """
+    )
     theme = param.Selector(
         default="default",
         objects=["default", "dark"],
@@ -87,10 +132,62 @@ The sequence of files is given by the list of filenames (see below).""",
     # See https://github.com/holoviz/panel/issues/2937#issuecomment-974696364
     uri = param.Parameter(
         constant=True,
+        precedence=-1,
         doc="""
-    Parameter used to transfer the image. Will be renamed to data_uri later.
+    The data uri the value was set from with `set_value_from_data_uri`. It is '' if the value
+    was uploaded or set in another way, i.e. a data uri is never computed just to set it. Use
+    `get_data_uri` to get the data uri of any value. It is only available on the server. The
+    image is sent to the client via _display. Will be renamed to data_uri later.
     """,
     )
+    content_id = param.String(
+        constant=True,
+        doc="""
+    Identifies the content of the value. It is the sha256 hex digest of the value.
+    """,
+    )
+    display_encoding = param.ClassSelector(
+        class_=DisplayEncoding,
+        default=DISPLAY_ENCODING,
+        instantiate=False,
+        allow_None=True,
+        precedence=-1,
+        doc="""
+    The policy for encoding a compact preview of an image set from the server for display. The
+    value keeps the original. Defaults to the shared DISPLAY_ENCODING. None means the original
+    is displayed.
+    """,
+    )
+    _chunk = param.Dict(
+        doc="""
+    The latest chunk uploaded by the client. A dict with the keys 'id', 'offset', 'size' and
+    'data'."""
+    )
+    _chunk_ack = param.Dict(
+        constant=True,
+        doc="""
+    Acknowledges the latest chunk. A dict with the keys 'id' and 'offset'. The offset is where
+    the client should continue the upload. An offset of -1 means the upload is cancelled. The
+    acknowledgement of the last chunk also has the 'content_id' of the uploaded image.""",
+    )
+    _display = param.Dict(
+        constant=True,
+        doc="""
+    The image to display. A dict with the keys 'id' and 'uri'. The uri is the url of the image
+    on the CONTENT_STORE endpoint if served. Otherwise it is a data uri. It is empty if the
+    client already has the image with the id.""",
+    )
+    _missing = param.String(
+        doc="""
+    The id of an image the client was asked to display but does not have.""",
+    )
+    _cache_size = param.Integer(
+        16,
+        constant=True,
+        doc="""
+    The number of images the client keeps by id. The client and the server evict the least
+    recently used ids in the same order.""",
+    )
 
     _template = """
 <style>
@@ -129,7 +226,7 @@ The sequence of files is given by the list of filenames (see below).""",
 
 """
 
-    _scripts = read_scripts("image_input.js", __file__)
+    _scripts = merge_scripts(TRANSFER_SCRIPTS, read_scripts("image_input.js", __file__))
 
     def __init__(self, **params):
         params["theme"] = params.get("theme", get_theme())
@@ -141,31 +238,78 @@ The sequence of files is given by the list of filenames (see below).""",
                 `set_value_from_data_uri` method."""
             )
         super().__init__(**params)
+        self._receiver = ChunkReceiver(self, self._handle_upload_complete)
+        self._image_value = None
+        # The ids of the images the client has
+        self._client_ids = LRUCache(self._cache_size)
 
-    @param.depends("uri", watch=True)
-    def _handleuri_change(self):
-        url = self.uri
-        if not url:
-            self.value = None
+    def _set_image_value(self, image_value: Optional[ImageValue], uri: str = ""):
+        self._image_value = image_value
+        if image_value is None:
+            with param.edit_constant(self):
+                self.param.set_param(
+                    uri=uri, value=None, content_id="", _display={"id": "", "uri": ""}
+                )
             return
 
-        index = url.find(",")
-        if index < 0:
-            self.value = None
+        # The value needs the bytes anyway. Getting them first identifies the image by its bytes
+        data = image_value.data
+        content_id = image_value.content_hash
+        # Only a reference is sent if the client already has the image
+        if self._client_ids.get(content_id):
+            display = {"id": content_id, "uri": ""}
+        else:
+            self._client_ids[content_id] = True
+            display = {"id": content_id, "uri": self._preview_src()}
+        with param.edit_constant(self):
+            self.param.set_param(uri=uri, content_id=content_id, _display=display, value=data)
+
+    @param.depends("_missing", watch=True)
+    def _handle_missing(self):
+        content_id = self._missing
+        if not content_id:
             return
+        self._missing = ""
+        if self._image_value is not None and self._image_value.content_hash == content_id:
+            self._client_ids[content_id] = True
+            with param.edit_constant(self):
+                self._display = {"id": content_id, "uri": self._preview_src()}
+
+    def _preview_src(self) -> str:
+        if self._image_value is None:
+            return ""
+        if self.display_encoding is None:
+            return self._image_value.src()
+        return self._image_value.preview(self.display_encoding).src()
+
+    @param.depends("_chunk", watch=True)
+    def _handle_chunk(self):
+        self._receiver.receive(self._chunk)
 
-        b64 = url[index + 1 :]
+    def _handle_upload_complete(self, data: bytes, _last_chunk: Dict) -> Dict:
+        self._image_value = ImageValue.from_bytes(data, self.mime_type)
+        content_id = self._image_value.content_hash
+        self._client_ids[content_id] = True
         with param.edit_constant(self):
-            self.value = b64decode(b64)
+            self.param.set_param(uri="", content_id=content_id)
+        self.value = self._image_value.data
+        # The client already displays the uploaded image. It remembers it by the content_id
+        return {"content_id": content_id}
+
+    @param.depends("cancel", watch=True)
+    def _handle_cancel(self):
+        self._receiver.cancel()
 
     def set_value_from_data_uri(self, data_uri: str):
-        """Sets the value
+        """Sets the value. An empty or invalid data uri clears the value.
 
         Args:
             data_uri (str): The data_uri to set the value from
         """
-        with param.edit_constant(self):
-            self.uri = data_uri
+        if not data_uri or data_uri.find(",") < 0:
+            self._set_image_value(None, data_uri)
+        else:
+            self._set_image_value(ImageValue.from_data_uri(data_uri), data_uri)
 
     def set_value_from_pillow_image(self, image: PIL.Image.Image):
         """Sets the value
@@ -173,9 +317,55 @@ The sequence of files is given by the list of filenames (see below).""",
         Args:
             image (PIL.Image.Image): The Image to set the value from
         """
-        with param.edit_constant(self):
-            self.uri = image_to_data_uri(image)
+        self.set_value_from_image_value(ImageValue.from_image(image))
+
+    def set_value_from_image_value(self, image_value: ImageValue):
+        """Sets the value. The bytes, image and previews already computed by the ImageValue are
+        reused. No data uri of the value is computed.
+
+        Args:
+            image_value (ImageValue): The ImageValue to set the value from
+        """
+        self._set_image_value(image_value)
+
+    def get_image_value(self) -> Optional[ImageValue]:
+        """Returns the value as an ImageValue. The ImageValue is shared, i.e. the image is only
+        decoded once no matter how many times it is requested."""
+        if self.value is None:
+            return None
+        if self._image_value is None or self._image_value.data is not self.value:
+            self._image_value = ImageValue.from_bytes(self.value, self.mime_type)
+        return self._image_value
+
+    def get_data_uri(self) -> str:
+        """Returns the value as a data uri. It is computed on demand and shared via the
+        ImageValue, i.e. it is only computed once per value.
 
-    def get_pil_image(self) -> PIL.Image.Image:
-        """Converts the value/ uri to a PIL.Image.Image"""
-        return image_from_data_uri(self.uri)
+        Returns:
+            str: The data uri or '' if there is no value
+        """
+        image_value = self.get_image_value()
+        if image_value is None:
+            return ""
+        return image_value.data_uri
+
+    def get_pil_image(self, target_size: Optional[Size] = None) -> Optional[PIL.Image.Image]:
+        """Converts the value to a PIL.Image.Image
+
+        The image is decoded directly from the binary `value`. The `uri` is not parsed again.
+
+        Args:
+            target_size (Optional[Size], optional): The (width, height) the image will be
+                resized to, for example by a model. If provided a JPEG is decoded at a reduced
+                resolution close to but not smaller than the target_size, which is much faster.
+                See `image_from_bytes`. Defaults to None, i.e. the full resolution.
+
+        Returns:
+            Optional[PIL.Image.Image]: The PIL Image or None if there is no value
+        """
+        image_value = self.get_image_value()
+        if image_value is None:
+            return None
+        if target_size is not None:
+            return image_from_bytes(image_value.data, target_size)
+        return image_value.image
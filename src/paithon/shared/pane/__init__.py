@@ -1,2 +1,13 @@
 """Shared panes"""
-from .doc_string_viewer import DocStringViewer
+from typing import TYPE_CHECKING
+
+from ...base.lazy import lazy_getattr
+
+if TYPE_CHECKING:  # Lets linters and IDEs resolve the lazily imported names
+    from .ansi import ansi_to_html
+    from .doc_string_viewer import DocStringViewer
+
+__all__ = ["DocStringViewer", "ansi_to_html"]
+__getattr__ = lazy_getattr(
+    __name__, {"DocStringViewer": ".doc_string_viewer", "ansi_to_html": ".ansi"}
+)
@@ -0,0 +1,66 @@
+"""Functionality for converting ANSI coded text, like the docstrings of Parameterized classes,
+to HTML.
+
+The HTML uses the same `.ansiNN` css classes as the `ansiconv` package.
+"""
+import html
+import re
+from typing import Dict, List
+
+SUPPORTED_SGR_CODES = (1, 3, 4, 9, *range(30, 38), *range(40, 48))
+
+# An escape character optionally followed by an SGR (m) or a cursor up (A) command
+_ESCAPE = re.compile(r"\x1b(?:\[((?:\d+;)*\d+)?([Am]))?")
+_CLASSES = {code: f"ansi{code}" for code in SUPPORTED_SGR_CODES}
+_SPANS: Dict[str, str] = {}
+
+
+def _span(codes: str) -> str:
+    span = _SPANS.get(codes)
+    if span is None:
+        classes = [_CLASSES[int(code)] for code in codes.split(";") if int(code) in _CLASSES]
+        span = f'<span class="{" ".join(classes)}">' if classes else ""
+        _SPANS[codes] = span
+    return span
+
+
+def ansi_to_html(ansi: str, replace_newline: bool = False) -> str:
+    """Returns the ANSI coded text converted to HTML.
+
+    The text following an SGR command like `\\x1b[1;32m` is wrapped in a span with the css
+    classes of the supported codes. The text itself is html escaped.
+
+    Example:
+
+    >>> ansi_to_html("\\x1b[1;32mParameters\\x1b[0m of <Screenshot>")
+    '<span class="ansi1 ansi32">Parameters</span> of &lt;Screenshot&gt;'
+
+    Args:
+        ansi (str): The ANSI coded text
+        replace_newline (bool, optional): Whether or not to replace newlines with <br />.
+            Defaults to False.
+
+    Returns:
+        str: The HTML
+    """
+    # Escaping does not change the commands. The split returns the text before the first
+    # command followed by (codes, command, text) triples for each command
+    parts = _ESCAPE.split(html.escape(ansi, quote=False))
+    blocks: List[str] = [parts[0]]
+    for index in range(1, len(parts), 3):
+        codes, command, text = parts[index : index + 3]
+        if command == "A" and blocks:
+            # Emulates moving the cursor up
+            blocks.pop()
+            while blocks and "\n" not in blocks[-1]:
+                blocks.pop()
+        if codes:
+            span = _span(codes)
+            if span:
+                text = f"{span}{text}</span>"
+        blocks.append(text)
+
+    text = "".join(blocks)
+    if replace_newline:
+        text = text.replace("\n", "<br />\n")
+    return text
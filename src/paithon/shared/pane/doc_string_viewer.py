@@ -1,10 +1,13 @@
 """This module contains functionality to view docstrings of Parameterized Classes
 """
-import ansiconv
+import hashlib
+
 import panel as pn
 import param
 
+from ...base.cache import LRUCache
 from ...base.component import extract_layout_parameters, get_theme
+from .ansi import ansi_to_html
 
 # Inspiration at https://iterm2colorschemes.com/
 ANSI_THEMES = {
@@ -85,16 +88,21 @@ class DocStringViewer(pn.viewable.Viewer):
         if object:
             params["object"] = object
         super().__init__(**params)
-        self._html_pane = pn.pane.HTML(sizing_mode="stretch_both")
+        self._html_pane = pn.pane.HTML(
+            sizing_mode="stretch_both", css_classes=[_css_class(self.palette, self.theme)]
+        )
+        # The stylesheet is rendered with the viewer, so it does not matter whether
+        # pn.extension was called before or after this module was imported
+        self._style_pane = pn.pane.HTML(STYLE, width=0, height=0, margin=0, sizing_mode="fixed")
         if "scroll" not in layout_params:
             layout_params["scroll"] = True
-        self.layout = pn.Column(self._html_pane, **layout_params)
+        self.layout = pn.Column(self._style_pane, self._html_pane, **layout_params)
         self._update_html()
 
     def __panel__(self):
         return self.layout
 
-    @param.depends("object", "theme", "palette", watch=True)
+    @param.depends("object", watch=True)
     def _update_html(self):
         with param.edit_constant(self):
             doc = self.object.__doc__
@@ -102,54 +110,78 @@ class DocStringViewer(pn.viewable.Viewer):
                 doc = "\n".join(doc.split("\n")[1:])
             else:
                 doc = ""
-            self._html = self._to_html(doc, self.theme, self.palette)
+            self._html = self._to_html(doc, self.object)
 
     @param.depends("_html", watch=True)
     def _update_html_pane(self):
         self._html_pane.object = self._html
 
-    @classmethod
-    def _to_html(cls, txt, theme, palette):
+    # Switching the theme or palette only toggles the css class on the client
+    @param.depends("theme", "palette", watch=True)
+    def _update_css_classes(self):
+        self._html_pane.css_classes = [_css_class(self.palette, self.theme)]
+
+    @staticmethod
+    def _to_html(txt, obj=None):
         if not txt:
             return ""
-        html = ansiconv.to_html(txt)
-        css = cls._get_css(**ANSI_THEMES[palette][theme])
-        html = f"""
-        <style>{css}</style>
-        <pre class="ansi_fore ansi_back">{html}</pre>
-        """
+        cls = obj if isinstance(obj, type) else type(obj)
+        key = (cls, hashlib.sha256(txt.encode("utf8")).hexdigest())
+        html = HTML_CACHE.get(key)
+        if html is None:
+            html = f'<pre class="ansi_fore ansi_back">{ansi_to_html(txt)}</pre>'
+            HTML_CACHE[key] = html
         return html
 
-    @staticmethod
-    def _get_css(  # pylint: disable=too-many-arguments
-        background="#000000",
-        color="#FFFFFF",
-        red="#FF0000",
-        green="#00FF00",
-        blue="#0000FF",
-        cyan="#00FFFF",
-    ):
-        return f"""
-    .ansi_fore {{ color: {color}; }}
-    .ansi_back {{ background-color: {background}; padding: 20px; calc(100% - 60px);; border-radius: 4px; opacity: 0.8;font: 1rem Inconsolata, monospace; }}
-    .ansi1 {{ font-weight: bold; }}
-    .ansi3 {{ font-weight: italic; }}
-    .ansi4 {{ text-decoration: underline; }}
-    .ansi9 {{ text-decoration: line-through; }}
-    .ansi30 {{ color: {background}; }}
-    .ansi31 {{ color: {red}; }}
-    .ansi32 {{ color: {green}; }}
-    .ansi33 {{ color: #FFFF00; }}
-    .ansi34 {{ color: {blue}; }}
-    .ansi35 {{ color: #FF00FF; }}
-    .ansi36 {{ color: {cyan}; }}
-    .ansi37 {{ color: {color}; }}
-    .ansi40 {{ background-color: {background}; }}
-    .ansi41 {{ background-color: {red}; }}
-    .ansi42 {{ background-color: {green}; }}
-    .ansi43 {{ background-color: #FFFF00; }}
-    .ansi44 {{ background-color: {blue}; }}
-    .ansi45 {{ background-color: #FF00FF; }}
-    .ansi46 {{ background-color: {cyan}; }}
-    .ansi47 {{ background-color: {color}; }}
-    """
+
+def _css_class(palette, theme):
+    return f"paithon-ansi-{palette.lower()}-{theme}"
+
+
+def _get_css(  # pylint: disable=too-many-arguments
+    css_class,
+    *,
+    background="#000000",
+    color="#FFFFFF",
+    red="#FF0000",
+    green="#00FF00",
+    blue="#0000FF",
+    cyan="#00FFFF",
+):
+    return f"""
+.{css_class} .ansi_fore {{ color: {color}; }}
+.{css_class} .ansi_back {{ background-color: {background}; padding: 20px; calc(100% - 60px);; border-radius: 4px; opacity: 0.8;font: 1rem Inconsolata, monospace; }}
+.{css_class} .ansi1 {{ font-weight: bold; }}
+.{css_class} .ansi3 {{ font-weight: italic; }}
+.{css_class} .ansi4 {{ text-decoration: underline; }}
+.{css_class} .ansi9 {{ text-decoration: line-through; }}
+.{css_class} .ansi30 {{ color: {background}; }}
+.{css_class} .ansi31 {{ color: {red}; }}
+.{css_class} .ansi32 {{ color: {green}; }}
+.{css_class} .ansi33 {{ color: #FFFF00; }}
+.{css_class} .ansi34 {{ color: {blue}; }}
+.{css_class} .ansi35 {{ color: #FF00FF; }}
+.{css_class} .ansi36 {{ color: {cyan}; }}
+.{css_class} .ansi37 {{ color: {color}; }}
+.{css_class} .ansi40 {{ background-color: {background}; }}
+.{css_class} .ansi41 {{ background-color: {red}; }}
+.{css_class} .ansi42 {{ background-color: {green}; }}
+.{css_class} .ansi43 {{ background-color: #FFFF00; }}
+.{css_class} .ansi44 {{ background-color: {blue}; }}
+.{css_class} .ansi45 {{ background-color: #FF00FF; }}
+.{css_class} .ansi46 {{ background-color: {cyan}; }}
+.{css_class} .ansi47 {{ background-color: {color}; }}
+"""
+
+
+# The html of the docstrings rendered by all sessions, keyed by the class and the hash of the
+# docstring. The html does not depend on the theme and palette. They are applied by the css
+# classes of the shared STYLESHEET.
+HTML_CACHE = LRUCache(max_size=256)
+
+STYLESHEET = "".join(
+    _get_css(_css_class(palette, theme), **colors)
+    for palette, themes in ANSI_THEMES.items()
+    for theme, colors in themes.items()
+)
+STYLE = f"<style>{STYLESHEET}</style>"
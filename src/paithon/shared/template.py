@@ -1,8 +1,6 @@
 """Functionality to easily create templates"""
 import panel as pn
 
-pn.extension(sizing_mode="stretch_width")
-
 ACCENT_COLOR = "#0072B5"
 DEFAULT_PARAMS = {
     "site": "🧠 Paithon",
@@ -17,5 +15,21 @@ def fastlisttemplate(**params):
     Returns:
         [FastListTemplate]: A FastListTemplate
     """
+    load_extension()
     params = {**DEFAULT_PARAMS, **params}
     return pn.template.FastListTemplate(**params)
+
+
+_EXTENSION_LOADED = False
+
+
+def load_extension():
+    """Loads the Panel extension with the Paithon defaults.
+
+    It is called when the first template or component needing it is created instead of when
+    this module is imported. Only the first call has an effect.
+    """
+    global _EXTENSION_LOADED  # pylint: disable=global-statement
+    if not _EXTENSION_LOADED:
+        pn.extension(sizing_mode="stretch_width")
+        _EXTENSION_LOADED = True
@@ -1,2 +1,10 @@
 """Shared widgets to extend the widgets built in to Panel."""
-from .screenshot import Screenshot
+from typing import TYPE_CHECKING
+
+from ...base.lazy import lazy_getattr
+
+if TYPE_CHECKING:  # Lets linters and IDEs resolve the lazily imported names
+    from .screenshot import Screenshot
+
+__all__ = ["Screenshot"]
+__getattr__ = lazy_getattr(__name__, {"Screenshot": ".screenshot"})
@@ -1,3 +1,26 @@
+render=()=>{
+  function filter (node) {
+    return (node.tagName !== "FAST-TOOLTIP" && node.id!=="theme-switch");
+  }
+  // Returns a promise of the data url of a screenshot of the element
+  function toImage(element){
+    var toImage = domtoimage.toPng
+    if (data.format==="jpeg"){toImage = domtoimage.toJpeg}
+    if (data.format==="svg"){toImage = domtoimage.toSvg}
+    return toImage(element, {filter: filter, scale: data.scale, quality: data.quality, bgcolor: data.bgcolor})
+  }
+  // Transfers the blobs to the server as one blob. sizes is null for a single screenshot
+  function transfer(blobs, sizes){
+    const type = (blobs.find(function(blob){return blob.type}) || {type: ""}).type
+    state.startTransfer(new Blob(blobs), {type: type, sizes: sizes})
+  }
+  function toBlob(dataUrl){
+    return fetch(dataUrl).then(function(response){return response.blob()})
+  }
+  state.toImage = toImage
+  state.toBlob = toBlob
+  state.transferBlobs = transfer
+}
 takes=()=>{
   var screenshotTarget=document.body;
   if (data.target==='object'){
@@ -5,14 +28,8 @@ takes=()=>{
   } else if (data.target==='selection' && data.selection) {
     screenshotTarget = document.querySelector(data.selection)
   }
-  function filter (node) {
-    return (node.tagName !== "FAST-TOOLTIP" && node.id!=="theme-switch");
-  }
-  var toImage = domtoimage.toPng
-  if (data.format==="jpeg"){toImage = domtoimage.toJpeg}
-  if (data.format==="svg"){toImage = domtoimage.toSvg}
 
-  toImage(screenshotTarget, {filter: filter, scale: data.scale, quality: data.quality, bgcolor: data.bgcolor})
+  state.toImage(screenshotTarget)
   .then(function (dataUrl) {
       function download(dataUrl){
         var el = document.createElement("a");
@@ -33,9 +50,34 @@ takes=()=>{
       }
       if (data.actions.includes("download")){download(dataUrl)}
       if (data.actions.includes("open")){open(dataUrl)}
-      if (data.actions.includes("transfer")){data.uri = dataUrl}
+      if (data.actions.includes("transfer")){
+        state.toBlob(dataUrl).then(function(blob){state.transferBlobs([blob], null)})
+      }
   })
   .catch(function (error) {
       console.error('oops, something went wrong! Could not take screenshot', error);
   });
-}
\ No newline at end of file
+}
+_batch_takes=()=>{
+  // Captures the selections one at a time and transfers all of them in one transfer. A
+  // selection that cannot be captured results in an empty screenshot. The number captured so
+  // far is reported to the server for the progress.
+  const blobs = []
+  let captured = Promise.resolve()
+  data.batch.forEach(function(selection){
+    captured = captured.then(function(){
+      const element = document.querySelector(selection)
+      if (!element){return new Blob([])}
+      return state.toImage(element).then(state.toBlob)
+    }).catch(function(error){
+      console.error('Could not take screenshot of ' + selection, error);
+      return new Blob([])
+    }).then(function(blob){
+      blobs.push(blob)
+      data._captured = blobs.length
+    })
+  })
+  captured.then(function(){
+    state.transferBlobs(blobs, Array.from(blobs, function(blob){return blob.size}))
+  })
+}
@@ -1,9 +1,18 @@
 """The Screenshot widget allows you to take screenshot of objects or selections in your app."""
+import base64
+import io
+import zipfile
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
 import panel as pn
 import param
+from bokeh.model import Model
+from PIL import Image
 
+from ...base.assets import ASSET_LOADER, DOM_TO_IMAGE
 from ...base.component import get_theme
-from ...base.reactive import read_scripts
+from ...base.reactive import merge_scripts, read_scripts
+from ...base.transfer import TRANSFER_SCRIPTS, ChunkReceiver
 
 THEME_BGCOLOR = {
     "default": "white",
@@ -60,7 +69,8 @@ class Screenshot(pn.reactive.ReactiveHTML):
         objects=["transfer", "download", "open"],
         doc="""
     A list of actions to execute when the button is clicked. Default is 'download'. 'transfer' means
-    update the uri parameter. 'open' means open screenshot in a tab in the browser.""",
+    transfer the screenshot to the server in chunks and update the value and uri parameters.
+    'open' means open screenshot in a tab in the browser.""",
     )
 
     download_file_name = param.String(
@@ -68,7 +78,54 @@ class Screenshot(pn.reactive.ReactiveHTML):
         doc="""
     The name of the file to be downloaded""",
     )
-    uri = param.String(constant=True, doc="""The screenshot downloaded as a data_uri""")
+    value = param.Parameter(
+        constant=True,
+        precedence=-1,
+        doc="""
+    The encoded bytes of the transferred or exported screenshot""",
+    )
+    mime_type = param.String(
+        constant=True,
+        precedence=-1,
+        doc="""
+    The mime type of the value. For example 'image/png'""",
+    )
+    uri = param.String(
+        constant=True,
+        precedence=-1,
+        doc="""
+    The transferred or exported screenshot as a data_uri. It is only available on the server""",
+    )
+    batch = param.List(
+        class_=str,
+        doc="""
+    The selections captured by the latest batch. See `take_batch`""",
+    )
+    values = param.List(
+        constant=True,
+        precedence=-1,
+        doc="""
+    The encoded bytes of the screenshots of the latest transferred or exported batch""",
+    )
+    chunk_size = param.Integer(
+        256 * 1024,
+        bounds=(1024, None),
+        doc="""
+    The number of bytes of each chunk the screenshot is transferred to the server in.""",
+    )
+    max_size_in_mega_bytes = param.Integer(
+        50,
+        bounds=(1, None),
+        doc="""
+    The maximum size of a transfer in Mega Bytes. Larger transfers are cancelled.""",
+    )
+    progress = param.Integer(
+        constant=True,
+        bounds=(0, 100),
+        doc="""
+    The progress of the transfer or batch export in percent. The capture of a batch in the
+    browser fills the first half and its transfer the second half.""",
+    )
     open_target = param.Selector(
         default="_blank",
         objects=["_blank", "_self", "new"],
@@ -77,6 +134,25 @@ class Screenshot(pn.reactive.ReactiveHTML):
     )
     takes = param.Integer(label="Screenshots", doc="The number of screenshots taken")
 
+    _batch_takes = param.Integer(
+        doc="""
+    The number of batches taken. Triggers the capture of the batch on the client""",
+    )
+    _captured = param.Integer(
+        doc="""
+    The number of selections of the latest batch captured by the client so far""",
+    )
+    _chunk = param.Dict(
+        doc="""
+    The latest chunk of the screenshot transferred from the client"""
+    )
+    _chunk_ack = param.Dict(
+        constant=True,
+        doc="""
+    The server acknowledges each chunk with the offset of the next chunk. An offset of -1 means
+    the transfer is cancelled""",
+    )
+
     width = param.Integer(default=300)
     height = param.Integer(default=47)
     margin = param.Parameter(default=0)
@@ -88,11 +164,9 @@ ${object}
 """
     _child_config = {"name": "literal"}
 
-    _scripts = read_scripts("screenshot.js", __file__)
+    _scripts = merge_scripts(TRANSFER_SCRIPTS, read_scripts("screenshot.js", __file__))
 
-    __javascript__ = [
-        "https://cdn.jsdelivr.net/npm/dom-to-image-improved@2.8.0/src/dom-to-image-improved.min.js"
-    ]
+    __javascript__ = ASSET_LOADER.javascript(DOM_TO_IMAGE)
 
     def __init__(self, **params):
         if "object" in params and "target" not in params:
@@ -100,6 +174,7 @@ ${object}
         if "bgcolor" not in params:
             params["bgcolor"] = THEME_BGCOLOR[get_theme()]
         super().__init__(**params)
+        self._receiver = ChunkReceiver(self, self._handle_transfer_complete)
 
     @param.depends("take", watch=True)
     def _handle_click(self):
@@ -125,3 +200,224 @@ ${object}
             split = self.download_file_name.split(".")
             split[-1] = self.format
             self.download_file_name = ".".join(split)
+
+    @param.depends("_chunk", watch=True)
+    def _handle_chunk(self):
+        # The transfer of a batch fills the second half of the progress
+        batch = bool(self._chunk) and self._chunk.get("sizes") is not None
+        self._receiver.receive(self._chunk, progress_start=50 if batch else 0)
+
+    def _handle_transfer_complete(self, data: bytes, chunk: Dict):
+        if chunk.get("sizes") is None:
+            self._set_value(data, chunk["type"])
+        else:
+            self._set_values(_split(data, chunk["sizes"]), chunk["type"])
+
+    @param.depends("_captured", watch=True)
+    def _handle_captured(self):
+        if self.batch:
+            with param.edit_constant(self):
+                self.progress = 50 * self._captured // len(self.batch)
+
+    def _set_value(self, data: bytes, mime_type: str):
+        uri = f"data:{mime_type};base64," + base64.b64encode(data).decode("utf8")
+        # The parameters are updated together such that watchers see a consistent state
+        with param.edit_constant(self):
+            self.param.set_param(mime_type=mime_type, uri=uri, value=data)
+
+    def _set_values(self, values: List[bytes], mime_type: str):
+        with param.edit_constant(self):
+            self.param.set_param(mime_type=mime_type, values=values)
+
+    def take_batch(self, selections: Sequence[str]):
+        """Captures the selections in the browser in one round trip and transfers them to the
+        server. The `values` are updated when the transfer is complete. The `format`, `scale`,
+        `quality` and `bgcolor` apply to all screenshots.
+
+        Args:
+            selections (Sequence[str]): Selections like 'body' or '#main'
+        """
+        with param.edit_constant(self):
+            self.param.set_param(batch=list(selections), _captured=0, progress=0)
+        self._batch_takes += 1
+
+    def export_batch(self, objects: Sequence[Any], **kwargs) -> List[bytes]:
+        """Takes screenshots of the objects on the server without a browser session and updates
+        the `values`. The `format`, `scale`, `quality` and `bgcolor` apply to all screenshots.
+        See `export_screenshots`.
+
+        Args:
+            objects (Sequence[Any]): Panel objects, objects Panel can display or Bokeh models
+            kwargs: Additional arguments for `export_screenshots`. For example a selenium
+                `driver`
+
+        Returns:
+            List[bytes]: The encoded screenshots
+        """
+
+        def _update_progress(done: int):
+            with param.edit_constant(self):
+                self.progress = int(100 * done / len(objects))
+
+        values = export_screenshots(
+            objects,
+            img_format=self.format,
+            scale=self.scale,
+            quality=self.quality,
+            bgcolor=self.bgcolor,
+            progress=_update_progress,
+            **kwargs,
+        )
+        self._set_values(values, f"image/{self.format}")
+        return values
+
+    def to_zip(self) -> bytes:
+        """Returns the `values` of the latest batch as a zip archive
+
+        Returns:
+            bytes: The zip archive
+        """
+        return screenshots_to_zip(self.values, img_format=self.format)
+
+    def export(self, **kwargs) -> bytes:
+        """Takes a screenshot of the object on the server without a browser session and updates
+        the value and uri. See `export_screenshot`.
+
+        Args:
+            kwargs: Additional arguments for `export_screenshot`. For example a selenium
+                `driver`
+
+        Raises:
+            ValueError: If the target is not the object
+
+        Returns:
+            bytes: The encoded screenshot
+        """
+        if self.target != "object" or self.object is None:
+            raise ValueError("Only an object can be exported on the server, not a selection")
+        data = export_screenshot(
+            self.object,
+            img_format=self.format,
+            scale=self.scale,
+            quality=self.quality,
+            bgcolor=self.bgcolor,
+            **kwargs,
+        )
+        self._set_value(data, f"image/{self.format}")
+        return data
+
+
+def export_screenshot(  # pylint: disable=too-many-arguments
+    obj: Any,
+    *,
+    img_format: str = "png",
+    scale: float = 1.0,
+    quality: float = 1.0,
+    bgcolor: str = "white",
+    driver: Any = None,
+    timeout: int = 5,
+) -> bytes:
+    """Renders a Panel or Bokeh object headlessly on the server and returns the encoded image.
+    Useful for generating reports in batch.
+
+    The rendering requires the optional `selenium` package and a webdriver like geckodriver or
+    chromedriver. See the Bokeh documentation on exporting plots.
+
+    Args:
+        obj (Any): A Panel object, an object Panel can display or a Bokeh model
+        img_format (str, optional): 'png' or 'jpeg'. Defaults to "png".
+        scale (float, optional): A number for image scaling. Defaults to 1.0.
+        quality (float, optional): The quality of a 'jpeg' image between 0 and 1. Defaults to
+            1.0.
+        bgcolor (str, optional): The background color. Defaults to "white".
+        driver (Any, optional): A selenium webdriver to reuse. Defaults to None.
+        timeout (int, optional): The number of seconds to wait for the rendering. Defaults to
+            5.
+
+    Raises:
+        ValueError: If the img_format is not supported
+
+    Returns:
+        bytes: The encoded image
+    """
+    if img_format not in ("png", "jpeg"):
+        raise ValueError(f"The format {img_format!r} cannot be exported. Use 'png' or 'jpeg'")
+    # Importing bokeh.io.export is slow. So it is only done when needed
+    from bokeh.io.export import (  # pylint: disable=import-outside-toplevel
+        get_screenshot_as_png,
+    )
+
+    model = obj if isinstance(obj, Model) else pn.panel(obj).get_root()
+    image = get_screenshot_as_png(model, driver=driver, timeout=timeout)
+    if scale != 1.0:
+        size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+        image = image.resize(size)
+    background = Image.new("RGBA", image.size, bgcolor)
+    background.alpha_composite(image.convert("RGBA"))
+    output = io.BytesIO()
+    if img_format == "jpeg":
+        background.convert("RGB").save(output, "JPEG", quality=round(quality * 100))
+    else:
+        background.save(output, "PNG")
+    return output.getvalue()
+
+
+def export_screenshots(
+    objects: Sequence[Any], progress: Optional[Callable[[int], None]] = None, **kwargs
+) -> List[bytes]:
+    """Renders the objects headlessly on the server and returns the encoded images. The
+    webdriver is shared by all the objects. See `export_screenshot`.
+
+    Args:
+        objects (Sequence[Any]): Panel objects, objects Panel can display or Bokeh models
+        progress (Optional[Callable[[int], None]], optional): A function called with the number
+            of objects exported so far. Defaults to None.
+        kwargs: Additional arguments for `export_screenshot`. For example the `img_format`
+
+    Returns:
+        List[bytes]: The encoded images
+    """
+    if kwargs.get("driver") is None and objects:
+        # pylint: disable=import-outside-toplevel
+        from bokeh.io.webdriver import webdriver_control
+
+        kwargs["driver"] = webdriver_control.get()
+    values = []
+    for obj in objects:
+        values.append(export_screenshot(obj, **kwargs))
+        if progress:
+            progress(len(values))
+    return values
+
+
+def screenshots_to_zip(
+    values: Sequence[bytes], file_names: Optional[Sequence[str]] = None, img_format: str = "png"
+) -> bytes:
+    """Returns the screenshots as a zip archive
+
+    Args:
+        values (Sequence[bytes]): The encoded screenshots
+        file_names (Optional[Sequence[str]], optional): The file names in the archive. Defaults
+            to None, i.e. 'screenshot-1.png', 'screenshot-2.png' etc.
+        img_format (str, optional): The extension of the default file names. Defaults to "png".
+
+    Returns:
+        bytes: The zip archive
+    """
+    if file_names is None:
+        file_names = [f"screenshot-{index}.{img_format}" for index in range(1, len(values) + 1)]
+    output = io.BytesIO()
+    # The images are already compressed
+    with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_STORED) as archive:
+        for file_name, value in zip(file_names, values):
+            archive.writestr(file_name, value)
+    return output.getvalue()
+
+
+def _split(data: bytes, sizes: Sequence[int]) -> List[bytes]:
+    values = []
+    offset = 0
+    for size in sizes:
+        values.append(data[offset : offset + size])
+        offset += size
+    return values
@@ -1,10 +1,11 @@
 """Here we import the different task submodules/ collections"""
 from invoke import Collection
 
-from . import app, test
+from . import app, assets, test
 
 # pylint: disable=invalid-name
 # as invoke only recognizes lower case
 namespace = Collection()
 namespace.add_collection(test)
 namespace.add_collection(app)
+namespace.add_collection(assets)
@@ -0,0 +1,41 @@
+"""Module of tasks for building the JavaScript assets of the package
+
+"""
+from invoke import task
+
+
+@task
+def download(command):  # pylint: disable=unused-argument
+    """Downloads the JavaScript libraries into the paithon/dist folder
+
+    Arguments:
+        command {[type]} -- [description]
+    """
+    print(
+        """
+Downloads the JavaScript libraries
+==================================
+"""
+    )
+    from paithon.base.assets import download_assets  # pylint: disable=import-outside-toplevel
+
+    for file in download_assets():
+        print(file)
+
+
+@task
+def scripts(command):  # pylint: disable=unused-argument
+    """Validates the _scripts of the .js files and precompiles them into paithon/_scripts.json
+
+    Arguments:
+        command {[type]} -- [description]
+    """
+    print(
+        """
+Precompiles the _scripts
+========================
+"""
+    )
+    from paithon.base.reactive import compile_scripts  # pylint: disable=import-outside-toplevel
+
+    print(compile_scripts())
@@ -27,10 +27,10 @@ if __name__.startswith("bokeh"):
 
     def _get_url(value):
         if value:
-            return "_url: " + value[0:50] + "..."
+            return "_url: " + app.get_data_uri()[0:50] + "..."
         return "No Image Loaded"
 
-    iurl = pn.bind(_get_url, value=app.param.uri)
+    iurl = pn.bind(_get_url, value=app.param.value)
 
     progress = pn.widgets.Progress(value=-1, name="Progess", sizing_mode="stretch_width")
 
@@ -43,10 +43,14 @@ if __name__.startswith("bokeh"):
         app,
         parameters=[
             "accept",
+            "chunk_size",
             "filename",
             "mime_type",
             "fit",
             "max_size_in_mega_bytes",
+            "max_dimension",
+            "target_format",
+            "quality",
             "progress",
             "height",
             "width",
@@ -0,0 +1,36 @@
+"""Test of the assets module"""
+from bokeh.embed.bundle import extension_dirs
+
+from paithon.base.assets import APEXCHARTS, ASSET_LOADER, AssetLoader
+from paithon.base.classification import ClassificationPlot
+
+
+def test_asset_not_vendored_is_loaded_from_cdn(tmp_path):
+    """An asset not vendored in a source checkout is loaded from its CDN"""
+    loader = AssetLoader(directory=str(tmp_path))
+    assert loader.url(APEXCHARTS) == APEXCHARTS.cdn_url
+
+
+def test_vendored_asset(tmp_path):
+    """A vendored asset is served with a version, loaded from the CDN or inlined"""
+    # Given
+    (tmp_path / APEXCHARTS.name).write_bytes(b"var ApexCharts;")
+    loader = AssetLoader(directory=str(tmp_path))
+    javascript = loader.javascript(APEXCHARTS)
+    # Then
+    assert extension_dirs["paithon"] == str(tmp_path)
+    assert javascript[0].startswith("static/extensions/paithon/apexcharts.min.js?v=")
+    # When
+    loader.mode = "cdn"
+    # Then
+    assert javascript == [APEXCHARTS.cdn_url]
+    # When
+    loader.mode = "inline"
+    # Then
+    assert javascript == ["data:text/javascript;base64,dmFyIEFwZXhDaGFydHM7"]
+    ASSET_LOADER.param.trigger("directory")
+
+
+def test_components_use_the_asset_loader():
+    """The __javascript__ of the components is provided by the ASSET_LOADER"""
+    assert ClassificationPlot.__javascript__ == [ASSET_LOADER.url(APEXCHARTS)]
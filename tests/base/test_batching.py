@@ -0,0 +1,62 @@
+"""Test of the BatchScheduler"""
+import threading
+
+import pytest
+
+from paithon.base.batching import BatchScheduler
+
+
+def test_batch_scheduler_batches_concurrent_inputs():
+    """Inputs submitted within max_wait_ms are run in one batch"""
+    batch_sizes = []
+
+    def model(inputs):
+        batch_sizes.append(len(inputs))
+        return [item * 2 for item in inputs]
+
+    scheduler = BatchScheduler(model=model, max_batch_size=10, max_wait_ms=200)
+    futures = [scheduler.submit(item) for item in range(5)]
+    assert [future.result(timeout=5) for future in futures] == [0, 2, 4, 6, 8]
+    assert batch_sizes == [5]
+    assert scheduler.batches == 1
+
+
+def test_batch_scheduler_max_batch_size():
+    """A batch never contains more than max_batch_size inputs"""
+    batch_sizes = []
+
+    def model(inputs):
+        batch_sizes.append(len(inputs))
+        return inputs
+
+    scheduler = BatchScheduler(model=model, max_batch_size=2, max_wait_ms=200)
+    futures = [scheduler.submit(item) for item in range(5)]
+    assert [future.result(timeout=5) for future in futures] == [0, 1, 2, 3, 4]
+    assert max(batch_sizes) == 2
+
+
+def test_batch_scheduler_call_from_many_threads():
+    """Calls from many threads, i.e. sessions, are routed back to the right caller"""
+    scheduler = BatchScheduler(model=lambda inputs: [item + 1 for item in inputs])
+    results = {}
+
+    def _call(item):
+        results[item] = scheduler(item)
+
+    threads = [threading.Thread(target=_call, args=(item,)) for item in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == {item: item + 1 for item in range(20)}
+
+
+def test_batch_scheduler_model_error():
+    """An error raised by the model is raised by the futures of the batch"""
+
+    def model(inputs):
+        raise ValueError("Bad model")
+
+    scheduler = BatchScheduler(model=model)
+    with pytest.raises(ValueError):
+        scheduler(1)
@@ -0,0 +1,95 @@
+"""Test of the caches shared across sessions"""
+from paithon.base.cache import LRUCache, PredictionCache, URLCache
+from paithon.base.http import HTTP_CLIENT, HTTPResponse
+
+
+def _response(content=b"", status_code=200, headers=None):
+    return HTTPResponse(status_code, headers or {}, content)
+
+
+def test_lru_cache_evicts_least_recently_used():
+    """The least recently used entry is evicted when the cache is full"""
+    cache = LRUCache(max_size=2)
+    cache["a"] = 1
+    cache["b"] = 2
+    assert cache.get("a") == 1
+    cache["c"] = 3
+    assert "b" not in cache
+    assert cache.keys() == ["a", "c"]
+    assert (cache.hits, cache.misses) == (1, 0)
+
+
+def test_lru_cache_bounded_by_sizeof():
+    """The cache can be bounded by the size of the values"""
+    cache = LRUCache(max_size=10, sizeof=len)
+    cache["a"] = b"12345"
+    cache["b"] = b"12345"
+    cache["c"] = b"1"
+    assert cache.keys() == ["b", "c"]
+    assert cache.size == 6
+    cache["d"] = b"12345678901"
+    assert "d" not in cache
+
+
+def test_lru_cache_resize():
+    """Entries are evicted when the cache is resized"""
+    cache = LRUCache(max_size=3)
+    for key in "abc":
+        cache[key] = key
+    cache.resize(1)
+    assert cache.keys() == ["c"]
+
+
+def test_url_cache_downloads_once(mocker):
+    """A url is only downloaded once"""
+    get = mocker.patch.object(HTTP_CLIENT, "get", return_value=_response(b"data"))
+    cache = URLCache()
+    assert cache.get("https://example.com/a.png") == b"data"
+    assert cache.get("https://example.com/a.png") == b"data"
+    get.assert_called_once()
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_url_cache_revalidates_stale_entry(mocker):
+    """A stale entry is revalidated with the ETag and Last-Modified headers"""
+    get = mocker.patch.object(
+        HTTP_CLIENT,
+        "get",
+        return_value=_response(b"data", headers={"ETag": '"abc"', "Last-Modified": "yesterday"}),
+    )
+    cache = URLCache(max_age=0)
+    cache.get("https://example.com/a.png")
+    get.return_value = _response(status_code=304)
+    assert cache.get("https://example.com/a.png") == b"data"
+    assert get.call_args[1]["headers"] == {
+        "If-None-Match": '"abc"',
+        "If-Modified-Since": "yesterday",
+    }
+
+
+def test_url_cache_persists_to_directory(mocker, tmp_path):
+    """The contents are read from the directory instead of downloaded again"""
+    get = mocker.patch.object(HTTP_CLIENT, "get", return_value=_response(b"data"))
+    URLCache(directory=str(tmp_path)).get("https://example.com/a.png")
+    assert URLCache(directory=str(tmp_path)).get("https://example.com/a.png") == b"data"
+    get.assert_called_once()
+
+
+def test_url_cache_max_size(mocker):
+    """Contents larger than the max_size are not kept in memory"""
+    get = mocker.patch.object(HTTP_CLIENT, "get", return_value=_response(b"data"))
+    cache = URLCache(max_size=3)
+    cache.get("https://example.com/a.png")
+    cache.get("https://example.com/a.png")
+    assert get.call_count == 2
+
+
+def test_prediction_cache():
+    """Results are cached per model and key"""
+    cache = PredictionCache(max_entries=1)
+    cache.set("model", "key", (None, None, []))
+    assert cache.get("model", "key") == (None, None, [])
+    assert cache.get("other model", "key") is None
+    cache.set("model", "other key", (None, None, []))
+    assert cache.get("model", "key") is None
+    assert (cache.hits, cache.misses) == (1, 2)
@@ -1,5 +1,12 @@
 """Test of the classification module"""
-from paithon.base.classification import ClassificationPlot
+import json
+import shutil
+import subprocess
+
+import numpy as np
+import pytest
+
+from paithon.base.classification import ClassificationPlot, top_k_output_json
 from paithon.image.image_classification import dummy_model
 
 
@@ -12,3 +19,87 @@ def test_classification_plot_constructor_with_arguments():
     """Can construct ClassificationPlot with arguments"""
     _, _, output_json = dummy_model(None)
     ClassificationPlot(output_json=output_json)
+
+
+# Runs the scripts of the ClassificationPlot with a fake ApexCharts and animation frames
+_CHART_HARNESS = """
+const calls = []
+const frames = []
+const window = {requestAnimationFrame: (callback) => {frames.push(callback); return frames.length}}
+class ApexCharts {
+  constructor(element, options){calls.push(["new", options.series[0].data])}
+  render(){}
+  updateSeries(series){calls.push(["updateSeries", series[0].data])}
+  updateOptions(options){calls.push(["updateOptions"])}
+}
+const plot = {}
+const state = {}
+const data = %(data)s
+function flush(){frames.splice(0).forEach((callback) => callback())}
+%(render)s
+function setOutput(output){
+  data.output_json = output
+  %(output_json)s
+}
+setOutput([{label: "a", score: 0.5}])
+setOutput([{label: "a", score: 0.6}])
+setOutput([{label: "a", score: 0.7}])
+flush()
+setOutput([{label: "a", score: 0.7}])
+flush()
+console.log(JSON.stringify(calls))
+"""
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="requires node")
+def test_classification_plot_updates_series_only():
+    """Changes of the output_json within an animation frame update only the series of the chart
+    once. An unchanged output_json does not update the chart"""
+    # Given
+    plot = ClassificationPlot(output_json=[{"label": "a", "score": 0.1}])
+    data = {
+        "output_json": plot.output_json,
+        "theme": plot.theme,
+        "color": plot.color,
+        "_base_options": {},
+    }
+    scripts = ClassificationPlot._scripts  # pylint: disable=protected-access
+    script = _CHART_HARNESS % {
+        "data": json.dumps(data),
+        "render": scripts["render"],
+        "output_json": scripts["output_json"],
+    }
+    # When
+    result = subprocess.run(
+        ["node", "-e", script], capture_output=True, check=True, text=True
+    ).stdout
+    # Then
+    assert json.loads(result) == [
+        ["new", [{"x": "a", "y": 10}]],
+        ["updateSeries", [{"x": "a", "y": 70}]],
+    ]
+
+
+def test_top_k_output_json_from_arrays():
+    """Only the top_k labels of a (labels, scores) pair are returned, sorted by score"""
+    labels = np.array([f"label {index}" for index in range(1000)])
+    scores = np.linspace(0, 1, 1000)
+    output_json = top_k_output_json((labels, scores), top_k=3)
+    assert output_json == [
+        {"label": "label 999", "score": 1.0},
+        {"label": "label 998", "score": scores[998]},
+        {"label": "label 997", "score": scores[997]},
+    ]
+
+
+def test_top_k_output_json_from_list_pair():
+    """A (labels, scores) pair can also be a list"""
+    output_json = top_k_output_json([["cat", "dog"], [0.2, 0.7]])
+    assert output_json == [{"label": "dog", "score": 0.7}, {"label": "cat", "score": 0.2}]
+
+
+def test_top_k_output_json_from_dicts():
+    """A list of dicts is sorted by score"""
+    classification = [{"label": "a", "score": 0.1}, {"label": "b", "score": 0.9}]
+    assert top_k_output_json(classification) == classification[::-1]
+    assert top_k_output_json(classification, top_k=1) == classification[1:]
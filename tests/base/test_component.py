@@ -1,7 +1,10 @@
 """Test of the component utility functions"""
+import asyncio
+
 import panel as pn
 
-from paithon.base.component import get_theme
+from paithon.base import component
+from paithon.base.component import call_soon, get_theme
 
 
 class MockState:  # pylint: disable=too-few-public-methods
@@ -34,3 +37,48 @@ def test_get_theme_other(mocker):  # pylint: disable=missing-function-docstring
     returned"""
     mocker.patch.object(pn, "state", MockState({"theme": [b"other"]}))
     assert get_theme() == "default"
+
+
+def test_call_soon_without_session():
+    """Without a session the callback is called right away"""
+    calls = []
+    call_soon(lambda: calls.append(1))
+    assert calls == [1]
+
+
+def test_call_soon_with_coroutine_function_without_session():
+    """Without a session a coroutine function is awaited right away"""
+    calls = []
+
+    async def callback():
+        calls.append(1)
+
+    call_soon(callback)
+    assert calls == [1]
+
+
+def test_call_soon_with_session(mocker):
+    """With a session the callback is added as a next tick callback"""
+    doc = mocker.Mock()
+    callback = mocker.Mock()
+    call_soon(callback, doc)
+    doc.add_next_tick_callback.assert_called_once_with(callback)
+    callback.assert_not_called()
+
+
+def test_call_soon_with_coroutine_function_in_running_loop():
+    """In a running event loop the coroutine is scheduled as a task a reference is kept to"""
+    calls = []
+
+    async def callback():
+        calls.append(1)
+
+    async def main():
+        call_soon(callback)
+        assert len(component._TASKS) == 1  # pylint: disable=protected-access
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+
+    asyncio.run(main())
+    assert calls == [1]
+    assert not component._TASKS  # pylint: disable=protected-access
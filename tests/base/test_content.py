@@ -0,0 +1,112 @@
+"""Tests of the content addressed endpoint"""
+import asyncio
+import hashlib
+import threading
+
+import pytest
+import requests
+from tornado import httpserver, netutil, web
+
+from paithon.base.content import CONTENT_STORE, CONTENT_URL, ContentStore, rest_provider
+
+TIMEOUT = 5
+
+
+@pytest.fixture(name="store")
+def fixture_store():
+    """Returns a ContentStore"""
+    return ContentStore()
+
+
+@pytest.fixture(name="server_url")
+def fixture_server_url(store):
+    """Returns the url of a local tornado server serving the patterns of the store"""
+    started = threading.Event()
+    context = {}
+
+    def run():
+        asyncio.set_event_loop(asyncio.new_event_loop())
+        sockets = netutil.bind_sockets(0, "127.0.0.1")
+        server = httpserver.HTTPServer(web.Application(store.patterns()))
+        server.add_sockets(sockets)
+        context["port"] = sockets[0].getsockname()[1]
+        context["loop"] = asyncio.get_event_loop()
+        started.set()
+        context["loop"].run_forever()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    started.wait()
+    yield f"http://127.0.0.1:{context['port']}/"
+    context["loop"].call_soon_threadsafe(context["loop"].stop)
+    thread.join()
+
+
+def test_add(store):
+    """The contents are stored once by their sha256 hex digest"""
+    content_id = store.add(b"hello", "text/plain")
+    assert content_id == hashlib.sha256(b"hello").hexdigest()
+    assert store.add(b"hello", "text/plain") == content_id
+    assert content_id in store
+    assert store.get(content_id).data == b"hello"
+
+
+def test_max_size(store):
+    """The least recently used contents are evicted"""
+    store.max_size = 10
+    first = store.add(b"12345678", "text/plain")
+    second = store.add(b"abcdefgh", "text/plain")
+    assert first not in store
+    assert second in store
+
+
+def test_url(store):
+    """The url is relative to the page of the application"""
+    assert store.url("abc") == CONTENT_URL + "abc"
+
+
+def test_patterns_sets_serving(store):
+    """The store is serving when its patterns are registered"""
+    assert not store.serving
+    store.patterns()
+    assert store.serving
+
+
+def test_rest_provider():
+    """The rest provider registers the patterns of the shared store"""
+    try:
+        patterns = rest_provider([], "rest")
+        assert CONTENT_STORE.serving
+    finally:
+        CONTENT_STORE.serving = False
+    assert patterns[0][0] == rf"/{CONTENT_URL}([0-9a-f]{{64}})"
+    assert patterns[0][2] == {"store": CONTENT_STORE}
+
+
+def test_get(store, server_url):
+    """The contents are served with immutable cache headers and an ETag"""
+    content_id = store.add(b"\x89PNG", "image/png")
+    response = requests.get(server_url + store.url(content_id), timeout=TIMEOUT)
+    assert response.status_code == 200
+    assert response.content == b"\x89PNG"
+    assert response.headers["Content-Type"] == "image/png"
+    assert response.headers["ETag"] == f'"{content_id}"'
+    assert "immutable" in response.headers["Cache-Control"]
+
+
+def test_get_not_modified(store, server_url):
+    """A request with a matching If-None-Match header is answered with 304 Not Modified"""
+    content_id = store.add(b"\x89PNG", "image/png")
+    response = requests.get(
+        server_url + store.url(content_id),
+        headers={"If-None-Match": f'"{content_id}"'},
+        timeout=TIMEOUT,
+    )
+    assert response.status_code == 304
+    assert not response.content
+
+
+def test_get_missing(store, server_url):
+    """Unknown contents are not found"""
+    response = requests.get(server_url + store.url("0" * 64), timeout=TIMEOUT)
+    assert response.status_code == 404
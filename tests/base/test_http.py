@@ -0,0 +1,58 @@
+"""Test of the pooled http client"""
+import functools
+import http.server
+import threading
+
+import pytest
+import requests
+
+from paithon.base.http import HTTPClient
+
+
+@pytest.fixture(name="server_url")
+def fixture_server_url(tmp_path):
+    """Returns the url of a local http server serving a file 'data.bin' of 1000 bytes"""
+    (tmp_path / "data.bin").write_bytes(bytes(1000))
+    handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=str(tmp_path))
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_get(server_url):
+    """Can get the contents of a url"""
+    response = HTTPClient().get(server_url + "/data.bin")
+    assert response.status_code == 200
+    assert response.content == bytes(1000)
+    assert response.headers["content-length"] == "1000"
+
+
+def test_get_reuses_session(server_url):
+    """The session is reused for all requests"""
+    client = HTTPClient()
+    client.get(server_url + "/data.bin")
+    session = client.session
+    client.get(server_url + "/data.bin")
+    assert client.session is session
+
+
+def test_get_larger_than_max_size(server_url):
+    """A response larger than the max_size raises a ValueError"""
+    with pytest.raises(ValueError):
+        HTTPClient(max_size=999).get(server_url + "/data.bin")
+
+
+def test_get_error_status(server_url):
+    """A response with an error status raises an HTTPError"""
+    with pytest.raises(requests.HTTPError):
+        HTTPClient().get(server_url + "/missing.bin")
+
+
+def test_map(server_url):
+    """Can download many urls concurrently"""
+    client = HTTPClient(max_workers=2)
+    urls = [server_url + "/data.bin"] * 5
+    assert client.map(lambda url: len(client.get(url).content), urls) == [1000] * 5
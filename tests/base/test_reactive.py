@@ -1,9 +1,20 @@
 """Test of the reactive helper functions that makes working with ReactiveHTML easier"""
+import builtins
+import json
+import os
 import pathlib
 
 import pytest
 
-from paithon.base.reactive import _clean_script, read_scripts, text_to_scripts
+from paithon.base import reactive
+from paithon.base.reactive import (
+    _clean_script,
+    compile_scripts,
+    merge_scripts,
+    read_scripts,
+    text_to_scripts,
+    validate_scripts,
+)
 
 EXAMPLE_SCRIPTS = [
     (  # Reference Example
@@ -51,16 +62,32 @@ theme=(state,data)=>{
         """
 render=()=>{
     color=(x)=>{
-        return {"x": x["value"]
+        return {"x": x["value"]}
     }
 }""",
         {
             "render": """\
 color=(x)=>{
-    return {"x": x["value"]
+    return {"x": x["value"]}
 }"""
         },
     ),
+    # Braces are matched, also at the start of a line, and ignored in strings, template literals,
+    # comments and regular expressions
+    (
+        'render=()=>{\nif (data.value) {\n  state.text = "}" + `${data.value}}`\n}\n// }\n'
+        "/* } */ state.pattern = /\\}/\n}\nvalue=()=>{\n  my_func(value)\n}",
+        {
+            "render": 'if (data.value) {\n  state.text = "}" + `${data.value}}`\n}\n// }\n'
+            "/* } */ state.pattern = /\\}/",
+            "value": "my_func(value)",
+        },
+    ),
+    # Arrow functions without parentheses, spaces and Windows line endings
+    (
+        "render = () => {\r\n  console.log(data)\r\n}\r\nvalue=event=>{\r\n  my_func(event)\r\n}",
+        {"render": "console.log(data)", "value": "my_func(event)"},
+    ),
 ]
 
 EXAMPLE_DIRTY_CLEAN_SCRIPTS = [("  console.log(data)\n", "console.log(data)")]
@@ -97,3 +124,112 @@ def test_read_scripts_using_full_path():
     """Test that a javascript filed can be read and converted appropriately"""
     path = pathlib.Path(__file__).parent / "test_reactive.js"
     assert read_scripts(path) == TEST_REACTIVE_JS
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "",
+        "console.log(data)\nrender=()=>{\n}",
+        "render=()=>{\n  console.log(data)\n",
+        "render=()=>{\nif (data.value) {\n}\n",
+    ],
+)
+def test_validate_scripts_raises(text):
+    """Text outside the scripts and scripts not ended are not valid"""
+    with pytest.raises(ValueError):
+        validate_scripts(text)
+
+
+def test_read_scripts_is_memoized(tmp_path, mocker):
+    """The file is parsed again only if it has been modified"""
+    # Given
+    path = tmp_path / "test.js"
+    path.write_text("render=()=>{\n  console.log(data)\n}\n", encoding="utf8")
+    text_to_scripts_spy = mocker.spy(reactive, "text_to_scripts")
+    # When
+    assert read_scripts(path) == {"render": "console.log(data)"}
+    assert read_scripts(path) == {"render": "console.log(data)"}
+    # Then
+    assert text_to_scripts_spy.call_count == 1
+    # When
+    mtime = path.stat().st_mtime_ns
+    path.write_text("render=()=>{\n  console.log(state)\n}\n", encoding="utf8")
+    os.utime(path, ns=(mtime + 1_000_000_000, mtime + 1_000_000_000))
+    # Then
+    assert read_scripts(path) == {"render": "console.log(state)"}
+    assert text_to_scripts_spy.call_count == 2
+
+
+def test_merge_scripts():
+    """Scripts with the same name are concatenated in order"""
+    shared = {"render": "state.send = send", "_chunk_ack": "state.send()"}
+    own = {"render": "state.send()", "value": "update(data.value)"}
+    assert merge_scripts(shared, own) == {
+        "render": "state.send = send\nstate.send()",
+        "_chunk_ack": "state.send()",
+        "value": "update(data.value)",
+    }
+
+
+def test_compile_scripts(tmp_path, monkeypatch):
+    """The scripts of the package can be precompiled into an artifact"""
+    # Given
+    monkeypatch.setattr(reactive, "SCRIPTS_ARTIFACT", tmp_path / "_scripts.json")
+    # When
+    artifact = compile_scripts()
+    # Then
+    try:
+        entries = json.loads(artifact.read_text(encoding="utf8"))
+        assert "base/classification.js" in entries
+        assert read_scripts("classification.js", reactive.__file__) == (
+            entries["base/classification.js"]["scripts"]
+        )
+    finally:
+        reactive._read_artifact.cache_clear()  # pylint: disable=protected-access
+
+
+@pytest.fixture(name="compiled")
+def fixture_compiled(tmp_path, monkeypatch):
+    """A .js file in a package with a compiled artifact"""
+    path = tmp_path / "test.js"
+    path.write_text("render=()=>{\n  console.log(data)\n}\n", encoding="utf8")
+    monkeypatch.setattr(reactive, "PACKAGE_DIR", tmp_path)
+    monkeypatch.setattr(reactive, "SCRIPTS_ARTIFACT", tmp_path / "_scripts.json")
+    compile_scripts()
+    yield path
+    reactive._read_artifact.cache_clear()  # pylint: disable=protected-access
+
+
+def _modify(path):
+    mtime = path.stat().st_mtime_ns
+    path.write_text("render=()=>{\n  console.log(state)\n}\n", encoding="utf8")
+    os.utime(path, ns=(mtime + 1_000_000_000, mtime + 1_000_000_000))
+
+
+def test_read_scripts_from_artifact_does_not_read_the_file(compiled, mocker):
+    """The scripts are taken from the artifact without opening or parsing the file"""
+    # Given
+    read_scripts(compiled)
+    open_spy = mocker.spy(builtins, "open")
+    text_to_scripts_spy = mocker.spy(reactive, "text_to_scripts")
+    # When
+    scripts = read_scripts(compiled)
+    # Then
+    assert scripts == {"render": "console.log(data)"}
+    open_spy.assert_not_called()
+    text_to_scripts_spy.assert_not_called()
+
+
+def test_read_scripts_ignores_stale_artifact(compiled, monkeypatch):
+    """In a source checkout a file changed after compiling the artifact is parsed again"""
+    monkeypatch.setattr(reactive, "SOURCE_CHECKOUT", True)
+    _modify(compiled)
+    assert read_scripts(compiled) == {"render": "console.log(state)"}
+
+
+def test_read_scripts_trusts_artifact_of_installed_package(compiled, monkeypatch):
+    """The artifact of an installed package is used even if the modification time differs"""
+    monkeypatch.setattr(reactive, "SOURCE_CHECKOUT", False)
+    _modify(compiled)
+    assert read_scripts(compiled) == {"render": "console.log(data)"}
@@ -0,0 +1,79 @@
+"""Test of the chunked transfer functionality"""
+import base64
+
+import param
+import pytest
+
+from paithon.base.transfer import ChunkAssembler, ChunkReceiver
+
+
+def _chunks(value: bytes, size: int):
+    for offset in range(0, len(value), size):
+        yield offset, base64.b64encode(value[offset : offset + size]).decode("ascii")
+
+
+def test_chunk_assembler_reassembles_value():
+    """The chunks are reassembled to the original value"""
+    value = bytes(range(256)) * 10
+    assembler = ChunkAssembler("id", len(value))
+    for offset, data in _chunks(value, 100):
+        assert not assembler.complete
+        assembler.add(offset, data)
+    assert assembler.complete
+    assert assembler.progress == 100
+    assert assembler.getvalue() == value
+
+
+def test_chunk_assembler_ignores_unexpected_offset():
+    """A chunk with an unexpected offset is ignored so the client can resume"""
+    assembler = ChunkAssembler("id", 6)
+    assembler.add(0, base64.b64encode(b"abc").decode("ascii"))
+    assert assembler.add(0, base64.b64encode(b"abc").decode("ascii")) == 3
+    assert assembler.add(5, base64.b64encode(b"f").decode("ascii")) == 3
+    assert assembler.progress == 50
+
+
+def test_chunk_assembler_raises_error_if_chunk_too_large():
+    """A chunk beyond the size of the value raises a ValueError"""
+    assembler = ChunkAssembler("id", 2)
+    with pytest.raises(ValueError):
+        assembler.add(0, base64.b64encode(b"abc").decode("ascii"))
+
+
+class _Owner(param.Parameterized):
+    max_size_in_mega_bytes = param.Integer(1)
+    progress = param.Integer(constant=True)
+    _chunk_ack = param.Dict(constant=True)
+
+
+def test_chunk_receiver_acknowledges_chunks():
+    """Each chunk is acknowledged and the value is passed on when the transfer is complete"""
+    owner = _Owner()
+    received = []
+
+    def on_complete(data, chunk):
+        received.append((data, chunk["type"]))
+        return {"content_id": "abc"}
+
+    receiver = ChunkReceiver(owner, on_complete)
+    value = b"hello world"
+    for offset, data in _chunks(value, 6):
+        chunk = {"id": "1", "offset": offset, "size": len(value), "data": data, "type": "text"}
+        receiver.receive(chunk, progress_start=50)
+        if offset == 0:
+            assert owner._chunk_ack == {"id": "1", "offset": 6}  # pylint: disable=protected-access
+            assert owner.progress == 50 + 54 // 2
+    ack = owner._chunk_ack  # pylint: disable=protected-access
+    assert ack == {"id": "1", "offset": len(value), "content_id": "abc"}
+    assert owner.progress == 100
+    assert received == [(value, "text")]
+    assert receiver.transfer is None
+
+
+def test_chunk_receiver_cancels_transfer_larger_than_max_size():
+    """A transfer larger than the max size is cancelled by its first chunk"""
+    owner = _Owner()
+    receiver = ChunkReceiver(owner, lambda data, chunk: None)
+    receiver.receive({"id": "1", "offset": 0, "size": 2000000, "data": ""})
+    assert owner._chunk_ack == {"id": "1", "offset": -1}  # pylint: disable=protected-access
+    assert receiver.transfer is None
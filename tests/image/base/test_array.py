@@ -0,0 +1,71 @@
+"""Tests of the array module"""
+import numpy as np
+import pytest
+
+from paithon.image.base.array import IMAGENET_MEAN, IMAGENET_STD, stack_batch, to_array
+from paithon.image.base.pillow import ImageValue
+
+
+def test_to_array_is_the_same_as_numpy(image):
+    """The array equals the conventional numpy preprocessing"""
+    # Given
+    expected = np.asarray(image.convert("RGB").resize((224, 224)), dtype=np.float32) / 255
+    expected = ((expected - IMAGENET_MEAN) / IMAGENET_STD).transpose(2, 0, 1)
+    # When
+    result = to_array(image, (224, 224), layout="CHW", mean=IMAGENET_MEAN, std=IMAGENET_STD)
+    # Then
+    assert result.shape == (3, 224, 224)
+    assert result.dtype == np.float32
+    np.testing.assert_allclose(result, expected, atol=1e-5)
+
+
+def test_to_array_writes_to_out(image):
+    """The array is written to the preallocated out array"""
+    out = np.empty((image.height, image.width, 3), dtype=np.uint8)
+    result = to_array(ImageValue.from_image(image), dtype=np.uint8, out=out)
+    assert result is out
+    np.testing.assert_array_equal(out, np.asarray(image.convert("RGB")))
+
+
+def test_to_array_grayscale(image):
+    """A grayscale image has one channel"""
+    assert to_array(image, (10, 20), mode="L").shape == (20, 10, 1)
+
+
+def test_to_array_with_wrong_out(image):
+    """An out array with the wrong shape raises a ValueError"""
+    with pytest.raises(ValueError):
+        to_array(image, (10, 10), out=np.empty((10, 10, 3), dtype=np.float64))
+
+
+def test_to_array_with_wrong_layout(image):
+    """An unsupported layout raises a ValueError"""
+    with pytest.raises(ValueError):
+        to_array(image, layout="NCHW")
+
+
+def test_stack_batch(image):
+    """The images are stacked into one contiguous batch array"""
+    # Given
+    images = [image, image.rotate(90, expand=True), ImageValue.from_image(image)]
+    # When
+    batch = stack_batch(images, (32, 16))
+    # Then
+    assert batch.shape == (3, 3, 16, 32)
+    assert batch.flags.c_contiguous
+    np.testing.assert_array_equal(batch[0], to_array(image, (32, 16), layout="CHW"))
+    np.testing.assert_array_equal(batch[2], batch[0])
+
+
+def test_stack_batch_nhwc_into_out(image):
+    """The batch is written to the preallocated out array"""
+    out = np.zeros((2, 16, 32, 3), dtype=np.float32)
+    result = stack_batch([image, image], (32, 16), layout="NHWC", out=out)
+    assert result is out
+    np.testing.assert_array_equal(out[1], to_array(image, (32, 16)))
+
+
+def test_stack_batch_without_images():
+    """An empty batch raises a ValueError"""
+    with pytest.raises(ValueError):
+        stack_batch([])
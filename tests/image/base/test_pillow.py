@@ -1,7 +1,26 @@
 """Test of the pillow module"""
+import base64
+import io
+import timeit
+from unittest import mock
+
 import PIL
+import pytest
+from PIL import ImageDraw
 
-from paithon.image.base.pillow import ImageViewer, image_from_data_uri, image_to_data_uri
+from paithon.base.content import ContentStore
+from paithon.image.base.pillow import (
+    DisplayEncoding,
+    ImageValue,
+    ImageViewer,
+    data_uri_to_bytes,
+    image_from_bytes,
+    image_from_data_uri,
+    image_to_base64_string,
+    image_to_bytes,
+    image_to_data_uri,
+    load_image_from_url,
+)
 
 
 def test_image_viewer_construction_without_image():
@@ -37,3 +56,258 @@ def test_load_image_from_datauri():
     # Then
     assert isinstance(result, PIL.Image.Image)
     assert image_to_data_uri(result) == uri
+
+
+def test_data_uri_to_bytes():
+    """Can decode the bytes of a data uri"""
+    assert data_uri_to_bytes("data:text/plain;base64,aGVsbG8=") == b"hello"
+
+
+def test_load_image_from_bytes(image):
+    """Test that we can load an image from the encoded bytes"""
+    # Given
+    data = data_uri_to_bytes(image_to_data_uri(image))
+    # When
+    result = image_from_bytes(data)
+    # Then
+    assert result.format == "PNG"
+    assert result.size == image.size
+
+
+def test_image_value_from_image(image):
+    """The representations of an ImageValue from an image are computed once"""
+    value = ImageValue.from_image(image)
+    assert value.image is image
+    assert value.mime_type == "image/png"
+    data, data_uri = value.data, value.data_uri
+    assert value.data is data
+    assert value.data_uri is data_uri
+    assert value.data_uri == image_to_data_uri(image)
+
+
+def test_image_value_from_data_uri(image):
+    """The image of an ImageValue from a data uri is decoded once"""
+    uri = image_to_data_uri(image)
+    value = ImageValue.from_data_uri(uri)
+    assert value.data_uri is uri
+    assert value.mime_type == "image/png"
+    decoded = value.image
+    assert value.image is decoded
+    assert decoded.size == image.size
+
+
+def test_image_value_from_bytes(image):
+    """The mime type of an ImageValue from bytes is determined from the data"""
+    value = ImageValue.from_bytes(data_uri_to_bytes(image_to_data_uri(image)))
+    assert value.mime_type == "image/png"
+    assert value.data_uri == image_to_data_uri(image)
+
+
+def test_image_value_from_image_without_format():
+    """An image without a format is encoded as png"""
+    value = ImageValue.from_image(PIL.Image.new(mode="RGB", size=(2, 2)))
+    assert value.data_uri.startswith("data:image/png;base64,")
+
+
+def test_image_viewer_with_image_value(image):
+    """Can view an ImageValue. Its data uri is reused"""
+    value = ImageValue.from_image(image)
+    viewer = ImageViewer(value)
+    assert viewer.data_url is value.data_uri
+
+
+def test_image_to_bytes_reuses_bytes_of_image_value(image):
+    """The bytes of an ImageValue are returned without encoding"""
+    # Given
+    uri = image_to_data_uri(image)
+    value = ImageValue.from_data_uri(uri)
+    # When
+    with mock.patch.object(value.image, "save") as save:
+        data = image_to_bytes(value)
+        assert image_to_data_uri(value) is uri
+    # Then
+    save.assert_not_called()
+    assert data is value.data
+    assert image_to_bytes(value, "JPEG" if image.mode == "RGB" else "PNG") is data
+
+
+def test_image_from_data_uri_is_writable(image):
+    """An image decoded from a data uri can be modified in place and is encoded again"""
+    # Given
+    uri = image_to_data_uri(image)
+    result = image_from_data_uri(uri)
+    # When
+    result.load()[0, 0] = (255, 0, 0, 255)
+    ImageDraw.Draw(result).rectangle((0, 0, 10, 10), fill="red")
+    # Then
+    assert image_to_data_uri(result) != uri
+
+
+def test_image_to_bytes_reuses_source_bytes(image, mocker):
+    """The downloaded bytes of an unmodified image are returned without encoding"""
+    # Given
+    data = _jpeg(image)
+    mocker.patch("paithon.image.base.pillow.load_bytes_from_url", return_value=data)
+    result = load_image_from_url("https://example.com/image.jpg")
+    save = mocker.spy(result, "save")
+    # When
+    base64_string = image_to_base64_string(result)
+    # Then
+    save.assert_not_called()
+    assert base64_string == base64.b64encode(data).decode("utf8")
+    assert image_to_bytes(result) is data
+    assert ImageValue.from_image(result).data is data
+
+
+def test_image_to_bytes_encodes_modified_image_again(image):
+    """An image modified in place is encoded again"""
+    # Given
+    uri = image_to_data_uri(image.convert("P"))
+    result = image_from_data_uri(uri)
+    data = data_uri_to_bytes(uri)
+    assert image_to_bytes(result) == data
+    # When
+    palette = result.getpalette()
+    result.putpalette(palette[3:] + palette[:3])
+    # Then
+    assert image_to_bytes(result) != data
+
+
+def test_image_to_bytes_encodes_to_other_format(image):
+    """An image is encoded again when another format is requested"""
+    result = image_from_data_uri(ImageValue.from_image(image.convert("RGB")).data_uri)
+    assert image_to_bytes(result, "JPEG").startswith(b"\xff\xd8")
+
+
+def test_image_value_content_hash(image):
+    """The content hash identifies the content of the image"""
+    uri = image_to_data_uri(image)
+    assert ImageValue.from_data_uri(uri).content_hash == ImageValue.from_bytes(
+        data_uri_to_bytes(uri)
+    ).content_hash
+    assert ImageValue.from_image(image).content_hash == ImageValue.from_image(
+        image.copy()
+    ).content_hash
+    assert ImageValue.from_image(image).content_hash != ImageValue.from_image(
+        image.rotate(90)
+    ).content_hash
+
+
+def test_image_value_content_hash_of_palette_images():
+    """Palette images with the same pixels but different palettes have different hashes"""
+    # Given
+    red = PIL.Image.new("P", (4, 4))
+    red.putpalette([255, 0, 0] * 256)
+    blue = PIL.Image.new("P", (4, 4))
+    blue.putpalette([0, 0, 255] * 256)
+    transparent = PIL.Image.new("P", (4, 4))
+    transparent.putpalette([255, 0, 0] * 256)
+    transparent.info["transparency"] = 0
+    # Then
+    hashes = {ImageValue.from_image(img).content_hash for img in (red, blue, transparent)}
+    assert len(hashes) == 3
+
+
+def test_image_value_src(image):
+    """The src is a data uri unless the endpoint of the store is served"""
+    # Given
+    store = ContentStore()
+    value = ImageValue.from_image(image)
+    # Then
+    assert value.src(store).startswith("data:image/png;base64,")
+    # When
+    store.serving = True
+    # Then
+    assert value.src(store) == "paithon/content/" + value.content_hash
+    assert store.get(value.content_hash).data == value.data
+
+
+def test_image_to_data_uri_without_format(image):
+    """An image without a format is encoded as png"""
+    processed = image.convert("RGB")
+    assert processed.format is None
+    assert image_to_data_uri(processed).startswith("data:image/png;base64,iVBORw0KGgo")
+
+
+def test_preview_of_large_png(image):
+    """The preview of a 12 MP png is a downscaled and much smaller webp"""
+    # Given
+    value = ImageValue.from_image(image.convert("RGB").resize((4000, 3000), PIL.Image.BICUBIC))
+    encoding = DisplayEncoding(formats=["WEBP"])
+    # When
+    preview = value.preview(encoding)
+    # Then
+    assert preview.mime_type == "image/webp"
+    assert preview.image.size == (1920, 1440)
+    assert len(value.data) / len(preview.data) > 10
+    assert value.preview(encoding) is preview
+
+
+def test_preview_of_small_image(image):
+    """A small image is displayed as it is"""
+    value = ImageValue.from_image(image)
+    assert value.preview(DisplayEncoding(max_dimension=None)) is value
+
+
+def test_preview_with_transparency(image):
+    """A format without alpha channel is skipped for an image with transparency"""
+    encoding = DisplayEncoding(formats=["JPEG"], max_dimension=100)
+    preview = ImageValue.from_image(image).preview(encoding)
+    assert preview.mime_type == "image/png"
+    assert preview.image.mode == "RGBA"
+    assert max(preview.image.size) == 100
+
+
+def test_image_viewer_shows_preview(image):
+    """The ImageViewer shows the preview of the image"""
+    viewer = ImageViewer(image, display_encoding=DisplayEncoding(formats=["JPEG"], min_size=0))
+    assert viewer.data_url.startswith("data:image/png;base64,")
+    viewer.image = image.convert("RGB")
+    assert viewer.data_url.startswith("data:image/jpeg;base64,")
+
+
+def _jpeg(image, size=(4000, 3000)) -> bytes:
+    buffered = io.BytesIO()
+    image.convert("RGB").resize(size, PIL.Image.BICUBIC).save(buffered, format="JPEG")
+    return buffered.getvalue()
+
+
+def test_image_from_bytes_with_target_size(image):
+    """A jpeg is decoded at a reduced resolution not smaller than the target size"""
+    result = image_from_bytes(_jpeg(image), target_size=(224, 224))
+    # The 4000x3000 jpeg is decoded at 1/8 of its size
+    assert result.size == (500, 375)
+
+
+def test_image_from_bytes_with_target_size_png(image):
+    """A png is reduced by an integer factor"""
+    buffered = io.BytesIO()
+    image.save(buffered, format="PNG")
+    result = image_from_bytes(buffered.getvalue(), target_size=(200, 200))
+    # The 1013x800 png is reduced by a factor 4
+    assert result.size == (254, 200)
+
+
+def test_image_from_data_uri_with_target_size(image):
+    """The bytes are not kept with a reduced image"""
+    uri = "data:image/jpeg;base64," + base64.b64encode(_jpeg(image)).decode("utf8")
+    result = image_from_data_uri(uri, target_size=(224, 224))
+    assert max(result.size) < 1000
+    assert image_to_data_uri(result) != uri
+    assert image_from_data_uri(uri, target_size=(4000, 3000)).size == (4000, 3000)
+
+
+@pytest.mark.slow
+def test_benchmark_decode_with_target_size(image):
+    """Decoding a large jpeg close to the target size is much faster than at full resolution"""
+    data = _jpeg(image)
+
+    def full():
+        image_from_bytes(data).resize((224, 224))
+
+    def reduced():
+        image_from_bytes(data, target_size=(224, 224)).resize((224, 224))
+
+    full_time = min(timeit.repeat(full, number=3, repeat=3))
+    reduced_time = min(timeit.repeat(reduced, number=3, repeat=3))
+    assert reduced_time * 3 < full_time
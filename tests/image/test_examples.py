@@ -0,0 +1,26 @@
+"""Test of the examples module"""
+from paithon.image.base.pillow import DisplayEncoding, image_to_bytes
+from paithon.image.examples import ImageExample, prewarm_examples
+
+
+def test_prewarm_examples(image, mocker):
+    """The images and previews of the examples are loaded once"""
+    # Given
+    load = mocker.patch(
+        "paithon.image.examples.load_bytes_from_url", return_value=image_to_bytes(image)
+    )
+    examples = [
+        ImageExample(url="https://example.com/a.png", name="A"),
+        ImageExample(url="https://example.com/b.png", name="B"),
+    ]
+    # When
+    prewarm_examples(examples)
+    prewarm_examples(examples)
+    # Then
+    assert load.call_count == 2
+    assert all(example.loaded for example in examples)
+    # The previews are computed already
+    encode = mocker.spy(DisplayEncoding, "encode")
+    for example in examples:
+        example.image_value.preview()
+    encode.assert_not_called()
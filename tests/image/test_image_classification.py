@@ -1,5 +1,14 @@
 """Test of the image_classification module"""
-from paithon.image.examples import IMAGE_EXAMPLES
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from paithon.base.batching import BatchScheduler
+from paithon.base.cache import PredictionCache
+from paithon.image.base.pillow import image_to_bytes
+from paithon.image.examples import IMAGE_EXAMPLES, ImageExample
 from paithon.image.image_classification import ImageClassifier, dummy_model
 
 
@@ -38,4 +47,166 @@ def test_can_instantiate_with_image_argument():
     classifier = ImageClassifier(image=image)
     # Then
     # list(classifier.image.getdata()) == list(image.getdata())
-    assert classifier.image == image
\ No newline at end of file
+    assert classifier.image == image
+
+
+def test_run_model_in_executor(image):
+    """The model can run in an executor without blocking"""
+    # Given
+    executor = ThreadPoolExecutor(max_workers=1)
+    classifier = ImageClassifier(model=dummy_model, executor=executor)
+    # When
+    classifier.image = image
+    executor.shutdown(wait=True)
+    # Then
+    assert classifier.output_json
+    assert not classifier.running
+
+
+def test_run_model_in_shut_down_executor(image):
+    """The classifier is not left running if the model cannot be submitted"""
+    # Given
+    executor = ThreadPoolExecutor(max_workers=1)
+    executor.shutdown()
+    classifier = ImageClassifier(model=dummy_model, executor=executor)
+    # When
+    with pytest.raises(RuntimeError):
+        classifier.image = image
+    # Then
+    assert not classifier.running
+
+
+def test_run_async_model(image):
+    """An async def model is awaited"""
+
+    async def model(image):
+        return dummy_model(image)
+
+    classifier = ImageClassifier(model=model)
+    classifier.image = image
+    assert classifier.output_json
+    assert not classifier.running
+
+
+def test_stale_result_is_dropped(image):
+    """The result of a run superseded by a newer image is dropped"""
+    # Given
+    release = threading.Event()
+
+    def model(img):
+        if img is image:
+            release.wait()
+            return None, None, [{"label": "stale", "score": 1.0}]
+        return None, None, [{"label": "latest", "score": 1.0}]
+
+    executor = ThreadPoolExecutor(max_workers=2)
+    classifier = ImageClassifier(model=model, executor=executor)
+    # When
+    classifier.image = image
+    assert classifier.running
+    classifier.image = image.copy()
+    release.set()
+    executor.shutdown(wait=True)
+    # Then
+    assert classifier.output_json == [{"label": "latest", "score": 1.0}]
+    assert not classifier.running
+
+
+def test_run_batched_model(image):
+    """The model can be a BatchScheduler running a batched model"""
+    scheduler = BatchScheduler(model=lambda images: [dummy_model(image) for image in images])
+    classifier = ImageClassifier(model=scheduler)
+    done = threading.Event()
+    classifier.param.watch(lambda event: done.set(), "output_json")
+    classifier.image = image
+    assert done.wait(timeout=5)
+    assert classifier.output_json
+
+
+def test_prediction_cache(image):
+    """The model is not called again for an image with the same content"""
+    # Given
+    calls = []
+
+    def model(img):
+        calls.append(img)
+        return dummy_model(img)
+
+    cache = PredictionCache()
+    classifier = ImageClassifier(model=model, prediction_cache=cache)
+    classifier.image = image
+    output_json = classifier.output_json
+    # When
+    ImageClassifier(model=model, prediction_cache=cache).image = image.copy()
+    classifier.image = image.copy()
+    # Then
+    assert len(calls) == 1
+    assert classifier.output_json == output_json
+    assert cache.misses == 1
+
+
+def test_prewarm(image, mocker):
+    """The predictions of the examples are cached before the first session"""
+    # Given
+    mocker.patch(
+        "paithon.image.examples.load_bytes_from_url", return_value=image_to_bytes(image)
+    )
+    example = ImageExample(url="https://example.com/a.png", name="A")
+    calls = []
+
+    def model(img):
+        calls.append(img)
+        return dummy_model(img)
+
+    cache = PredictionCache()
+    # When
+    ImageClassifier.prewarm(model, prediction_cache=cache, examples=[example]).result(timeout=5)
+    misses = cache.misses
+    classifier = ImageClassifier(model=model, prediction_cache=cache)
+    classifier.image = example.image
+    # Then
+    assert len(calls) == 1
+    assert cache.misses == misses
+    assert classifier.output_json
+
+
+def test_prewarm_twice(image, mocker):
+    """The model runs only once per example no matter how many times prewarm is called"""
+    # Given
+    mocker.patch(
+        "paithon.image.examples.load_bytes_from_url", return_value=image_to_bytes(image)
+    )
+    examples = [
+        ImageExample(url="https://example.com/a.png", name="A"),
+        ImageExample(url="https://example.com/b.png", name="B"),
+    ]
+    examples[1].prewarm(image_to_bytes(image.rotate(90)))
+    model = mocker.Mock(side_effect=dummy_model)
+    cache = PredictionCache()
+    # When
+    ImageClassifier.prewarm(model, prediction_cache=cache, examples=examples, background=False)
+    ImageClassifier.prewarm(model, prediction_cache=cache, examples=examples, background=False)
+    # Then
+    assert model.call_count == 2
+
+
+def test_top_k(image):
+    """Only the top_k labels are shown while the full classification is kept"""
+    # Given
+    labels = np.array([f"label {index}" for index in range(1000)])
+    scores = np.random.rand(1000)
+
+    def model(_img):
+        return None, None, (labels, scores)
+
+    classifier = ImageClassifier(model=model, top_k=3)
+    # When
+    classifier.image = image
+    # Then
+    assert classifier.classification[1] is scores
+    assert [item["score"] for item in classifier.output_json] == sorted(scores)[::-1][:3]
+    assert classifier.layout_plot.output_json == classifier.output_json
+    # When
+    classifier.top_k = 5
+    # Then
+    assert len(classifier.layout_json.object) == 5
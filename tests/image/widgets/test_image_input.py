@@ -1,7 +1,325 @@
 """Tests of the ImageInput"""
+import base64
+import struct
+import zlib
+
+from paithon.base.content import CONTENT_STORE
+from paithon.image.base.pillow import DisplayEncoding, ImageValue
 from paithon.image.widgets.image_input import ImageInput
 
 
 def test_can_construct():
     """Can construct an instance of ImageInput"""
     ImageInput()
+
+
+def test_value_is_binary(image):
+    """The value is the binary contents of the uploaded file"""
+    # Given
+    image_input = ImageInput()
+    # When
+    image_input.set_value_from_pillow_image(image)
+    # Then
+    assert isinstance(image_input.value, bytes)
+    assert image_input.value.startswith(b"\x89PNG")
+
+
+def test_get_pil_image(image):
+    """Can get the uploaded image as a PIL Image"""
+    # Given
+    image_input = ImageInput()
+    image_input.set_value_from_pillow_image(image)
+    # When
+    result = image_input.get_pil_image()
+    # Then
+    assert result.size == image.size
+    assert result.format == "PNG"
+
+
+def test_chunked_upload(image):
+    """The value is reassembled from the chunks uploaded by the client"""
+    # Given
+    image_input = ImageInput(chunk_size=1024)
+    image_input.set_value_from_pillow_image(image)
+    expected = image_input.value
+    image_input.set_value_from_data_uri("")
+    # When
+    offset = 0
+    while offset < len(expected):
+        chunk = expected[offset : offset + image_input.chunk_size]
+        image_input._chunk = {  # pylint: disable=protected-access
+            "id": "upload",
+            "offset": offset,
+            "size": len(expected),
+            "data": base64.b64encode(chunk).decode("ascii"),
+        }
+        offset = image_input._chunk_ack["offset"]  # pylint: disable=protected-access
+        assert image_input.progress == int(100 * offset / len(expected))
+    # Then
+    assert image_input.value == expected
+    assert image_input.get_pil_image().size == image.size
+
+
+def test_chunked_upload_too_large():
+    """An upload larger than max_size_in_mega_bytes is cancelled"""
+    image_input = ImageInput(max_size_in_mega_bytes=1)
+    image_input._chunk = {  # pylint: disable=protected-access
+        "id": "upload",
+        "offset": 0,
+        "size": 2000000,
+        "data": "",
+    }
+    assert image_input._chunk_ack == {  # pylint: disable=protected-access
+        "id": "upload",
+        "offset": -1,
+    }
+    assert image_input.value is None
+
+
+def test_chunked_upload_invalid_chunk():
+    """An upload with a chunk beyond the announced size is cancelled"""
+    image_input = ImageInput()
+    image_input._chunk = {  # pylint: disable=protected-access
+        "id": "upload",
+        "offset": 0,
+        "size": 2,
+        "data": base64.b64encode(b"abc").decode("ascii"),
+    }
+    assert image_input._chunk_ack == {  # pylint: disable=protected-access
+        "id": "upload",
+        "offset": -1,
+    }
+    assert image_input.value is None
+    assert image_input.progress == 0
+
+
+def test_get_data_uri_after_upload(image):
+    """The data uri of an uploaded value is computed on demand"""
+    # Given
+    image_input = ImageInput()
+    image_input.set_value_from_pillow_image(image)
+    data = image_input.value
+    image_input.set_value_from_data_uri("")
+    # When
+    image_input._chunk = {  # pylint: disable=protected-access
+        "id": "upload",
+        "offset": 0,
+        "size": len(data),
+        "data": base64.b64encode(data).decode("ascii"),
+    }
+    # Then
+    assert image_input.uri == ""
+    assert image_input.get_data_uri() == ImageValue.from_bytes(data).data_uri
+
+
+def test_cancel_upload():
+    """Can cancel an upload in progress"""
+    # Given
+    image_input = ImageInput()
+    image_input._chunk = {  # pylint: disable=protected-access
+        "id": "upload",
+        "offset": 0,
+        "size": 6,
+        "data": base64.b64encode(b"abc").decode("ascii"),
+    }
+    assert image_input.progress == 50
+    # When
+    image_input.cancel = True
+    # Then
+    assert image_input.progress == 0
+    assert image_input._chunk_ack["offset"] == -1  # pylint: disable=protected-access
+
+
+def test_client_side_resize_parameters():
+    """The downscaling and re-encoding parameters are synced to the browser"""
+    # Given
+    image_input = ImageInput(max_dimension=224, target_format="jpeg", quality=0.8)
+    # The data model of the ReactiveHTML is created dynamically
+    data = image_input.get_root().data  # pylint: disable=no-member
+    # Then
+    assert data.max_dimension == 224
+    assert data.target_format == "jpeg"
+    assert data.quality == 0.8
+    # When
+    image_input.max_dimension = None
+    # Then
+    assert data.max_dimension is None
+
+
+def test_set_value_from_image_value(image):
+    """The ImageValue is reused, i.e. the image is not decoded again"""
+    # Given
+    image_input = ImageInput()
+    image_value = ImageValue.from_image(image)
+    # When
+    image_input.set_value_from_image_value(image_value)
+    # Then
+    assert image_input.get_image_value() is image_value
+    assert image_input.value is image_value.data
+    assert image_input.get_pil_image() is image
+
+
+def test_set_value_from_image_value_computes_no_data_uri(image):
+    """Only the preview is encoded for display, not a data uri of the value"""
+    # Given
+    image_input = ImageInput(display_encoding=DisplayEncoding(formats=["WEBP"], max_dimension=100))
+    image_value = ImageValue.from_image(image)
+    # When
+    image_input.set_value_from_image_value(image_value)
+    # Then
+    assert image_input.uri == ""
+    assert not image_value._data_uri  # pylint: disable=protected-access
+    assert image_input.get_data_uri() == image_value.data_uri
+
+
+def _upload(image_input, data):
+    offset = 0
+    while offset < len(data):
+        image_input._chunk = {  # pylint: disable=protected-access
+            "id": "upload",
+            "offset": offset,
+            "size": len(data),
+            "data": base64.b64encode(data[offset : offset + image_input.chunk_size]).decode(),
+        }
+        offset = image_input._chunk_ack["offset"]  # pylint: disable=protected-access
+
+
+def test_image_is_sent_to_the_client_once(image):
+    """An image the client already has is only referenced by its content id"""
+    # Given
+    image_input = ImageInput()
+    image_value = ImageValue.from_image(image)
+    # When
+    image_input.set_value_from_image_value(image_value)
+    # Then
+    assert image_input.content_id == image_value.content_hash
+    assert image_input._display == {  # pylint: disable=protected-access
+        "id": image_value.content_hash,
+        "uri": image_value.preview(image_input.display_encoding).src(),
+    }
+    # When
+    image_input.set_value_from_data_uri("")
+    image_input.set_value_from_image_value(image_value)
+    # Then
+    assert image_input._display == {  # pylint: disable=protected-access
+        "id": image_value.content_hash,
+        "uri": "",
+    }
+    assert image_input.value == image_value.data
+
+
+def _png_chunk(kind: bytes, data: bytes) -> bytes:
+    return (
+        struct.pack(">I", len(data))
+        + kind
+        + data
+        + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+    )
+
+
+def _browser_png(width=4, height=3):
+    """Returns a png like a browser or camera would produce it. It has a text chunk and another
+    compression than Pillow uses, i.e. Pillow would not encode it to the same bytes"""
+    rows = b"".join(b"\x00" + bytes([10 * row, 20, 30]) * width for row in range(height))
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + _png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + _png_chunk(b"tEXt", b"Software\x00Browser")
+        + _png_chunk(b"IDAT", zlib.compress(rows, 1))
+        + _png_chunk(b"IEND", b"")
+    )
+
+
+def test_uploaded_image_is_not_sent_back():
+    """An uploaded image is identified by its content id and never echoed to the client"""
+    # Given
+    image_input = ImageInput(mime_type="image/png")
+    data = _browser_png()
+    # When
+    _upload(image_input, data)
+    # Then
+    content_id = image_input._chunk_ack["content_id"]  # pylint: disable=protected-access
+    assert content_id == ImageValue.from_bytes(data).content_hash == image_input.content_id
+    # When
+    image_input.set_value_from_pillow_image(image_input.get_pil_image())
+    # Then
+    assert image_input.value == data
+    assert image_input.content_id == content_id
+    assert image_input._display == {"id": content_id, "uri": ""}  # pylint: disable=protected-access
+
+
+def test_modified_uploaded_image_is_sent():
+    """An uploaded image modified on the server is encoded again and sent to the client"""
+    # Given
+    image_input = ImageInput(mime_type="image/png")
+    data = _browser_png()
+    _upload(image_input, data)
+    content_id = image_input.content_id
+    image = image_input.get_pil_image().copy()
+    image.putpixel((0, 0), (255, 255, 255))
+    # When
+    image_input.set_value_from_pillow_image(image)
+    # Then
+    assert image_input.value != data
+    assert image_input.content_id != content_id
+    assert image_input._display["uri"]  # pylint: disable=protected-access
+
+
+def test_missing_image_is_sent(image):
+    """An image the client does not have after all is sent when it is requested"""
+    # Given
+    image_input = ImageInput()
+    image_value = ImageValue.from_image(image)
+    _upload(image_input, image_value.data)
+    image_input.set_value_from_image_value(image_value)
+    # When
+    image_input._missing = image_value.content_hash  # pylint: disable=protected-access
+    # Then
+    assert image_input._display == {  # pylint: disable=protected-access
+        "id": image_value.content_hash,
+        "uri": image_value.preview(image_input.display_encoding).src(),
+    }
+    assert not image_input._missing  # pylint: disable=protected-access
+
+
+def test_display_url_when_served(image):
+    """The client gets the url of the image if the content endpoint is served"""
+    # Given
+    image_input = ImageInput()
+    CONTENT_STORE.serving = True
+    try:
+        # When
+        image_input.set_value_from_pillow_image(image)
+    finally:
+        CONTENT_STORE.serving = False
+    # Then
+    display = image_input._display  # pylint: disable=protected-access
+    assert display["uri"] == "paithon/content/" + image_input.content_id
+    assert CONTENT_STORE.get(image_input.content_id).data == image_input.value
+
+
+def test_display_preview(image):
+    """The client gets a preview of the image while the value keeps the original"""
+    # Given
+    image_input = ImageInput(display_encoding=DisplayEncoding(formats=["WEBP"], max_dimension=100))
+    # When
+    image_input.set_value_from_pillow_image(image)
+    # Then
+    display = image_input._display  # pylint: disable=protected-access
+    assert display["uri"].startswith("data:image/webp;base64,")
+    assert image_input.get_pil_image().size == image.size
+
+
+def test_get_pil_image_without_value():
+    """There is no image if there is no value"""
+    image_input = ImageInput()
+    assert image_input.get_pil_image() is None
+    assert image_input.get_pil_image(target_size=(200, 200)) is None
+
+
+def test_get_pil_image_with_target_size(image):
+    """Can get a reduced image close to the target size"""
+    image_input = ImageInput()
+    image_input.set_value_from_pillow_image(image)
+    result = image_input.get_pil_image(target_size=(200, 200))
+    assert result.size == (254, 200)
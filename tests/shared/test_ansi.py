@@ -0,0 +1,38 @@
+"""Tests and benchmark of the ANSI to HTML converter"""
+import timeit
+
+import pytest
+
+from paithon.image.widgets.image_input import ImageInput
+from paithon.shared.pane import ansi_to_html
+
+EXAMPLES = [
+    ("plain text", "plain text"),
+    ("\x1b[1;32mbold green\x1b[0m", '<span class="ansi1 ansi32">bold green</span>'),
+    ("\x1b[2mnot supported\x1b[0m", "not supported"),
+    ("a < b & c", "a &lt; b &amp; c"),
+    ("line 1\n\x1b[0mline 2\x1b[Aline 3", "line 1\nline 3"),
+]
+
+
+@pytest.mark.parametrize(["ansi", "expected"], EXAMPLES)
+def test_ansi_to_html(ansi, expected):
+    """The ANSI codes are converted to spans with the .ansiNN css classes"""
+    assert ansi_to_html(ansi) == expected
+
+
+def test_same_html_as_ansiconv():
+    """The html is the same as the html of ansiconv"""
+    ansiconv = pytest.importorskip("ansiconv")
+    doc = ImageInput.__doc__
+    assert ansi_to_html(doc) == ansiconv.to_html(doc)
+
+
+@pytest.mark.slow
+def test_benchmark_against_ansiconv():
+    """The conversion of a large docstring is faster than with ansiconv"""
+    ansiconv = pytest.importorskip("ansiconv")
+    doc = ImageInput.__doc__
+    ansiconv_time = min(timeit.repeat(lambda: ansiconv.to_html(doc), number=20, repeat=5))
+    paithon_time = min(timeit.repeat(lambda: ansi_to_html(doc), number=20, repeat=5))
+    assert paithon_time < ansiconv_time
@@ -1,8 +1,42 @@
 """Tests of the DocStringViewer"""
-from paithon.shared.pane.doc_string_viewer import DocStringViewer
+import panel as pn
+
+from paithon.shared.pane.doc_string_viewer import HTML_CACHE, STYLESHEET, DocStringViewer
 
 
 def test_can_construct():
     """Can construct an instance"""
     some_parameterized = DocStringViewer()
     DocStringViewer(some_parameterized)
+
+
+def test_html_is_cached():
+    """The html of a docstring is rendered once and shared by all viewers"""
+    HTML_CACHE.clear()
+    viewer = DocStringViewer(DocStringViewer())
+    hits = HTML_CACHE.hits
+    other = DocStringViewer(DocStringViewer(), palette="Solarized")
+    assert HTML_CACHE.hits == hits + 1
+    assert other._html == viewer._html  # pylint: disable=protected-access
+    assert "<style>" not in viewer._html  # pylint: disable=protected-access
+
+
+def test_palette_toggles_css_class():
+    """Changing the palette changes the css class but not the html"""
+    viewer = DocStringViewer(DocStringViewer())
+    html = viewer._html  # pylint: disable=protected-access
+    viewer.palette = "Solarized"
+    assert viewer._html_pane.css_classes == [  # pylint: disable=protected-access
+        "paithon-ansi-solarized-default"
+    ]
+    assert viewer._html == html  # pylint: disable=protected-access
+
+
+def test_stylesheet_is_rendered_with_the_viewer():
+    """The stylesheet is part of the layout, whether pn.extension ran before the import or not"""
+    pn.extension()
+    viewer = DocStringViewer(DocStringViewer())
+    assert STYLESHEET not in pn.config.raw_css
+    style_pane = viewer.layout[0]
+    assert style_pane.object == f"<style>{STYLESHEET}</style>"
+    assert STYLESHEET in style_pane.get_root().text  # pylint: disable=no-member
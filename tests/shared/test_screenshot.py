@@ -0,0 +1,136 @@
+"""Tests of the Screenshot widget"""
+import base64
+import io
+import zipfile
+
+import panel as pn
+import pytest
+from PIL import Image
+
+from paithon.shared.widgets.screenshot import Screenshot, export_screenshot
+
+
+def _send(screenshot, transfer_id, data, chunk_size):
+    offset = 0
+    while offset < len(data):
+        screenshot._chunk = {  # pylint: disable=protected-access
+            "id": transfer_id,
+            "offset": offset,
+            "size": len(data),
+            "type": "image/png",
+            "data": base64.b64encode(data[offset : offset + chunk_size]).decode("utf8"),
+        }
+        offset = screenshot._chunk_ack["offset"]  # pylint: disable=protected-access
+
+
+def test_transfer_in_chunks():
+    """The screenshot is transferred from the client in chunks"""
+    # Given
+    screenshot = Screenshot(actions=["transfer"], chunk_size=1024)
+    data = bytes(range(256)) * 10
+    # When
+    _send(screenshot, "transfer-1", data, 1024)
+    # Then
+    assert screenshot.value == data
+    assert screenshot.mime_type == "image/png"
+    assert screenshot.uri == "data:image/png;base64," + base64.b64encode(data).decode("utf8")
+    assert screenshot.progress == 100
+
+
+def test_transfer_larger_than_max_size_is_cancelled():
+    """A transfer larger than max_size_in_mega_bytes is cancelled without allocating it"""
+    # Given
+    screenshot = Screenshot(actions=["transfer"], max_size_in_mega_bytes=1)
+    # When
+    screenshot._chunk = {  # pylint: disable=protected-access
+        "id": "transfer-1",
+        "offset": 0,
+        "size": 1000001,
+        "type": "image/png",
+        "data": "",
+    }
+    # Then
+    assert screenshot._chunk_ack == {  # pylint: disable=protected-access
+        "id": "transfer-1",
+        "offset": -1,
+    }
+    assert screenshot._receiver.transfer is None  # pylint: disable=protected-access
+    assert screenshot.value is None
+
+
+def test_export(mocker):
+    """An object can be exported on the server"""
+    # Given
+    image = Image.new("RGBA", (20, 10), (255, 0, 0, 255))
+    get_screenshot = mocker.patch("bokeh.io.export.get_screenshot_as_png", return_value=image)
+    screenshot = Screenshot(object=pn.pane.Markdown("# Report"), format="jpeg", scale=0.5)
+    # When
+    data = screenshot.export()
+    # Then
+    get_screenshot.assert_called_once()
+    assert screenshot.value == data
+    assert screenshot.mime_type == "image/jpeg"
+    with Image.open(io.BytesIO(data)) as result:
+        assert (result.format, result.size) == ("JPEG", (10, 5))
+
+
+def test_export_raises():
+    """A selection or an svg cannot be exported on the server"""
+    with pytest.raises(ValueError):
+        Screenshot(selection="body").export()
+    with pytest.raises(ValueError):
+        export_screenshot(pn.pane.Markdown("# Report"), img_format="svg")
+
+
+def test_take_batch():
+    """A batch of screenshots is transferred from the client in one transfer"""
+    # Given
+    screenshot = Screenshot(chunk_size=1024)
+    values = [b"a" * 1500, b"", b"c" * 10]
+    # When
+    screenshot.take_batch(["#plot-1", "#missing", "#plot-2"])
+    assert screenshot.progress == 0
+    screenshot._captured = 3  # pylint: disable=protected-access
+    assert screenshot.progress == 50
+    data = b"".join(values)
+    screenshot._chunk = {  # pylint: disable=protected-access
+        "id": "batch-1",
+        "offset": 0,
+        "size": len(data),
+        "type": "image/png",
+        "sizes": [len(value) for value in values],
+        "data": base64.b64encode(data[:1000]).decode("utf8"),
+    }
+    assert screenshot.progress == 50 + 1000 * 100 // len(data) // 2
+    screenshot._chunk = {  # pylint: disable=protected-access
+        "id": "batch-1",
+        "offset": 1000,
+        "size": len(data),
+        "type": "image/png",
+        "sizes": [len(value) for value in values],
+        "data": base64.b64encode(data[1000:]).decode("utf8"),
+    }
+    # Then
+    assert screenshot.batch == ["#plot-1", "#missing", "#plot-2"]
+    assert screenshot._batch_takes == 1  # pylint: disable=protected-access
+    assert screenshot.values == values
+    assert screenshot.progress == 100
+
+
+def test_export_batch(mocker):
+    """A batch of objects can be exported on the server and zipped"""
+    # Given
+    image = Image.new("RGBA", (20, 10), (255, 0, 0, 255))
+    mocker.patch("bokeh.io.export.get_screenshot_as_png", return_value=image)
+    screenshot = Screenshot()
+    # When
+    values = screenshot.export_batch(
+        [pn.pane.Markdown("# Report 1"), pn.pane.Markdown("# Report 2")], driver=object()
+    )
+    # Then
+    assert len(values) == 2
+    assert screenshot.values == values
+    assert screenshot.progress == 100
+    with zipfile.ZipFile(io.BytesIO(screenshot.to_zip())) as archive:
+        assert archive.namelist() == ["screenshot-1.png", "screenshot-2.png"]
+        assert archive.read("screenshot-2.png") == values[1]
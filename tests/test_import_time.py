@@ -0,0 +1,53 @@
+"""Benchmark of the time it takes to import paithon"""
+import json
+import subprocess
+import sys
+
+import pytest
+
+# The time in seconds importing paithon may add to importing Panel itself
+MAX_IMPORT_TIME = 0.5
+
+BENCHMARK = """
+import json, sys, time
+import panel
+start = time.perf_counter()
+import paithon.image.image_classification
+import paithon.image.widgets
+import paithon.shared.pane
+import paithon.shared.template
+import paithon.shared.widgets
+print(json.dumps({
+    "time": time.perf_counter() - start,
+    "modules": [module for module in ("holoviews", "ansiconv") if module in sys.modules],
+}))
+"""
+
+
+def _run_benchmark() -> dict:
+    # A new interpreter is needed as the modules are already imported by other tests
+    output = subprocess.run(
+        [sys.executable, "-c", BENCHMARK], capture_output=True, check=True, text=True
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def test_no_heavy_imports():
+    """Importing paithon does not import heavy optional dependencies"""
+    assert not _run_benchmark()["modules"]
+
+
+@pytest.mark.slow
+def test_import_time():
+    """Importing paithon is fast"""
+    assert _run_benchmark()["time"] < MAX_IMPORT_TIME
+
+
+def test_lazy_attributes():
+    """The attributes of the packages are imported when they are accessed"""
+    import paithon  # pylint: disable=import-outside-toplevel
+    from paithon.image.widgets import ImageInput  # pylint: disable=import-outside-toplevel
+    from paithon.shared.widgets import Screenshot  # pylint: disable=import-outside-toplevel
+
+    assert paithon.image.widgets.ImageInput is ImageInput
+    assert Screenshot.__name__ == "Screenshot"